@@ -7,18 +7,83 @@
 
 import os
 import io
+import time
+import functools
 from typing import Optional, Tuple
 from google import genai
 from google.genai import types
 from PIL import Image, ImageDraw, ImageFont
 
 
+# Models tried when discovery fails or finds nothing image-capable
+_FALLBACK_MODELS = (
+    "models/gemini-2.5-flash-image",
+    "models/imagen-4.0-generate-001",
+    "models/imagen-4.0-fast-generate-001",
+)
+_PREFERRED_MODEL = 'models/gemini-2.5-flash-image'
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# Seconds before the discovered model list is refreshed
+_MODELS_TTL = 600
+
+
 class BillingRequired(Exception):
     """Raised when the Imagen API requires a billed Google account."""
     pass
 
 
-def generate_image(prompt: str, aspect_ratio: str = "1:1") -> Tuple[Optional[bytes], str]:
+@functools.lru_cache(maxsize=1)
+def _get_client(api_key: str) -> "genai.Client":
+    """Return a Gemini client for api_key, reused across generate_image calls."""
+    return genai.Client(api_key=api_key)
+
+
+@functools.lru_cache(maxsize=1)
+def _discover_models(api_key: str, ttl_bucket: int) -> Tuple[str, ...]:
+    """List image-capable models for api_key, preferred model first.
+
+    ttl_bucket only keys the cache so the list is refreshed every _MODELS_TTL
+    seconds. Exceptions propagate and are therefore not cached.
+    """
+    client = _get_client(api_key)
+    # Heuristic: choose models whose name mentions 'imagen' or 'image'.
+    # Prioritize gemini-2.5-flash-image (most reliable, no billing required);
+    # the sort is stable so the rest keep their listing order.
+    names = (_model_name(m) for m in client.models.list())
+    return tuple(sorted((n for n in names if _is_image_model(n)), key=lambda n: n != _PREFERRED_MODEL))
+
+
+def _model_name(m) -> str:
+    return getattr(m, 'name', None) or getattr(m, 'model', None) or str(m)
+
+
+def _is_image_model(name: str) -> bool:
+    ln = name.lower()
+    return 'imagen' in ln or ('gemini' in ln and 'image' in ln)
+
+
+def _get_models_to_try(api_key: str) -> Tuple[str, ...]:
+    """Return cached candidate models, falling back to known models."""
+    try:
+        candidate_models = _discover_models(api_key, int(time.monotonic() // _MODELS_TTL))
+    except Exception:
+        # If discovery fails, fall back to known models
+        candidate_models = ()
+    return candidate_models or _FALLBACK_MODELS
+
+
+def _invalidate_client_cache():
+    """Drop the cached client and model list (e.g. after billing/auth errors)."""
+    _get_client.cache_clear()
+    _discover_models.cache_clear()
+
+
+def _is_auth_error(msg: str) -> bool:
+    lm = msg.lower()
+    return 'api key' in lm or 'api_key' in lm or 'permission' in lm or 'unauthenticated' in lm
+
+
+def generate_image(prompt: str, aspect_ratio: str = "1:1", output_format: str = "raw") -> Tuple[Optional[bytes], str]:
     """
     Generate an image using Google Imagen API.
 
@@ -28,135 +93,161 @@ def generate_image(prompt: str, aspect_ratio: str = "1:1") -> Tuple[Optional[byt
     Args:
         prompt: Text description of the image to generate.
         aspect_ratio: Aspect ratio as string (e.g., "1:1", "16:9", "9:16", "4:3", "3:4").
+        output_format: "raw" returns API bytes untouched (placeholders are PNG),
+            "PNG" or "WEBP" re-encode only when the bytes are not already in that format.
     """
     api_key = os.environ.get("GEMINI_API_KEY")
     
     if not api_key:
-        return _placeholder_image("(No GEMINI_API_KEY set)"), "placeholder"
+        return _placeholder_image("(No GEMINI_API_KEY set)", output_format=output_format), "placeholder"
 
     try:
-        # Configure the Gemini client (the client will read GEMINI_API_KEY if available)
-        client = genai.Client(api_key=api_key)
-
-        # Auto-discover image-capable models available to this API key
-        candidate_models = []
-        try:
-            models = client.models.list()
-            model_names = []
-            for m in models:
-                name = getattr(m, 'name', None) or getattr(m, 'model', None) or str(m)
-                model_names.append(name)
-
-            # Heuristic: choose models whose name mentions 'imagen' or 'image'
-            for n in model_names:
-                ln = n.lower()
-                if 'imagen' in ln or ('gemini' in ln and 'image' in ln):
-                    candidate_models.append(n)
-
-            # Prioritize gemini-2.5-flash-image (most reliable, no billing required)
-            preferred = 'models/gemini-2.5-flash-image'
-            if preferred in candidate_models:
-                candidate_models.insert(0, candidate_models.pop(candidate_models.index(preferred)))
-
-        except Exception:
-            # If discovery fails, fall back to known models
-            pass
-
-        # Determine which models to try: prefer detected candidate models, else fall back to known models
-        if candidate_models:
-            models_to_try = candidate_models
-        else:
-            models_to_try = [
-                "models/gemini-2.5-flash-image",
-                "models/imagen-4.0-generate-001",
-                "models/imagen-4.0-fast-generate-001",
-            ]
+        # Client and discovered models are cached across calls
+        client = _get_client(api_key)
+        models_to_try = _get_models_to_try(api_key)
 
+        # Try candidate models one at a time in priority order, so a click is
+        # billed for at most one image
         for model in models_to_try:
             try:
-                response = client.models.generate_images(
-                    model=model,
-                    prompt=prompt,
-                    config=types.GenerateImagesConfig(
-                        number_of_images=1,
-                        aspect_ratio=aspect_ratio,
-                    ),
-                )
-
-                if getattr(response, 'generated_images', None):
-                    generated_image = response.generated_images[0]
-                    image_bytes = None
-                    
-                    # Extract bytes: try image_bytes first (raw API bytes), then PIL Image fallback
-                    if hasattr(generated_image, 'image') and hasattr(generated_image.image, 'image_bytes'):
-                        image_bytes = generated_image.image.image_bytes
-                    elif hasattr(generated_image, 'image') and hasattr(generated_image.image, 'save'):
-                        bio = io.BytesIO()
-                        generated_image.image.save(bio, format="PNG")
-                        bio.seek(0)
-                        image_bytes = bio.getvalue()
-                    
-                    if image_bytes:
-                        return image_bytes, model
+                image_bytes = _try_model(client, model, prompt, aspect_ratio, output_format)
             except Exception as model_error:
                 msg = str(model_error)
                 if "billing" in msg.lower() or "billed" in msg.lower():
                     raise BillingRequired("Imagen requires a billed Google account. Enable billing in AI Studio.")
+                if _is_auth_error(msg):
+                    _invalidate_client_cache()
                 continue
+            if image_bytes:
+                return image_bytes, model
 
         # If all models failed, fall back to placeholder with informative text
-        return _placeholder_image(f"No images generated for: {prompt[:40]} (check model access/billing)"), "placeholder"
+        return _placeholder_image(f"No images generated for: {prompt[:40]} (check model access/billing)", output_format=output_format), "placeholder"
 
     except Exception as e:
         # If this is a billing-related signal, re-raise so the GUI can handle it
         if isinstance(e, BillingRequired):
             raise
+        _invalidate_client_cache()
         error_msg = str(e)[:100]
-        return _placeholder_image(f"(API error: {error_msg})"), "placeholder"
+        return _placeholder_image(f"(API error: {error_msg})", output_format=output_format), "placeholder"
+
 
+def _try_model(client, model: str, prompt: str, aspect_ratio: str, output_format: str = "raw") -> Optional[bytes]:
+    """Request a single image from model; returns None if nothing came back."""
+    response = client.models.generate_images(
+        model=model,
+        prompt=prompt,
+        config=types.GenerateImagesConfig(
+            number_of_images=1,
+            aspect_ratio=aspect_ratio,
+        ),
+    )
 
+    if getattr(response, 'generated_images', None):
+        generated_image = response.generated_images[0]
 
-def _placeholder_image(text: str) -> bytes:
+        # Extract bytes: try image_bytes first (raw API bytes), then PIL Image fallback
+        if hasattr(generated_image, 'image') and hasattr(generated_image.image, 'image_bytes'):
+            data = generated_image.image.image_bytes
+            return _ensure_format(data, output_format) if data else data
+        elif hasattr(generated_image, 'image') and hasattr(generated_image.image, 'save'):
+            return _encode_image(generated_image.image, output_format)
+    return None
+
+
+def _load_font(size: int = 28) -> ImageFont.ImageFont:
+    try:
+        return ImageFont.truetype("arial.ttf", size)
+    except Exception:
+        return ImageFont.load_default()
+
+
+# Loaded once at import and reused by every placeholder
+_FONT = _load_font()
+# Scratch surface for text measurement outside of a real drawing
+_MEASURE_DRAW = ImageDraw.Draw(Image.new("L", (1, 1)))
+
+
+def _placeholder_image(text: str, font: ImageFont.ImageFont = _FONT, output_format: str = "PNG") -> bytes:
     w, h = 1024, 768
     img = Image.new("RGB", (w, h), color=(28, 28, 30))
     draw = ImageDraw.Draw(img)
-    try:
-        font = ImageFont.truetype("arial.ttf", 28)
-    except Exception:
-        font = ImageFont.load_default()
 
     margin = 20
-    lines = _wrap_text(draw, text, font, w - 2 * margin)
+    lines = _wrap_text(text, font, w - 2 * margin)
     y = margin
     for line in lines:
         draw.text((margin, y), line, font=font, fill=(220, 220, 220))
         # compute line height in a way compatible with multiple Pillow versions
-        _, line_h = _text_size(draw, line, font)
+        _, line_h = _cached_text_size(font, line)
         y += line_h + 8
 
+    return _encode_image(img, output_format)
+
+
+def _encode_image(img: Image.Image, output_format: str = "PNG") -> bytes:
+    """Encode a PIL image; "raw" and "PNG" both produce PNG."""
     bio = io.BytesIO()
-    img.save(bio, format="PNG")
+    if output_format.upper() == "WEBP":
+        img.save(bio, format="WEBP", quality=85, method=0)
+    else:
+        # Fast deflate: a few percent larger, several times quicker than the default level
+        img.save(bio, format="PNG", compress_level=1, optimize=False)
     return bio.getvalue()
 
 
-def _wrap_text(draw: ImageDraw.Draw, text: str, font: ImageFont.ImageFont, max_width: int):
+def _ensure_format(data: bytes, output_format: str) -> bytes:
+    """Return encoded image bytes in output_format, re-encoding only on a mismatch."""
+    fmt = output_format.upper()
+    if fmt == "RAW":
+        return data
+    if fmt == "PNG" and data[:8] == _PNG_SIGNATURE:
+        return data
+    if fmt == "WEBP" and data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return data
+    with Image.open(io.BytesIO(data)) as img:
+        return _encode_image(img, fmt)
+
+
+def _wrap_text(text: str, font: ImageFont.ImageFont, max_width: int):
+    # Measure each word once and accumulate widths greedily instead of
+    # re-measuring the whole growing line for every word.
     words = text.split()
+    if not words:
+        return []
+    widths = [_text_length(font, w) for w in words]
+    space_w = _text_length(font, " ")
+
     lines = []
-    cur = ""
-    for w in words:
-        test = (cur + " " + w).strip()
-        test_w, _ = _text_size(draw, test, font)
-        if test_w <= max_width:
-            cur = test
+    cur = [words[0]]
+    cur_w = widths[0]
+    for word, word_w in zip(words[1:], widths[1:]):
+        if cur_w + space_w + word_w <= max_width:
+            cur.append(word)
+            cur_w += space_w + word_w
         else:
-            if cur:
-                lines.append(cur)
-            cur = w
-    if cur:
-        lines.append(cur)
+            lines.append(" ".join(cur))
+            cur = [word]
+            cur_w = word_w
+    lines.append(" ".join(cur))
     return lines
 
 
+def _text_length(font: ImageFont.ImageFont, text: str) -> float:
+    """Advance width of text, falling back to the bounding box on old Pillow."""
+    try:
+        return font.getlength(text)
+    except Exception:
+        return _cached_text_size(font, text)[0]
+
+
+@functools.lru_cache(maxsize=1024)
+def _cached_text_size(font: ImageFont.ImageFont, text: str):
+    """Memoized _text_size keyed on (font, text); fonts hash by identity."""
+    return _text_size(_MEASURE_DRAW, text, font)
+
+
 def _text_size(draw: ImageDraw.Draw, text: str, font: ImageFont.ImageFont):
     """Return (width, height) of text using available Pillow APIs.
 
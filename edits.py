@@ -1,9 +1,18 @@
 """Image post-processing helpers.
-Provides apply_edits_bytes(image_bytes, settings) which returns PNG bytes.
+Provides apply_edits_bytes(image_bytes, settings) which returns PNG bytes, and
+apply_edits_array(arr, settings) / encode_png(arr) / write_png(arr, fp) for
+callers that keep decoded pixels around and only encode at the end.
 Attempts to use NumPy for a fast vignette; falls back to Pillow-only implementation.
 """
-from PIL import Image, ImageEnhance, ImageFilter, ImageOps
+from PIL import Image, ImageFilter, ImageOps, ImageStat
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import hashlib
 import io
+import math
+import os
+import threading
 
 try:
     import numpy as np
@@ -11,43 +20,862 @@ try:
 except Exception:
     _HAS_NUMPY = False
 
+try:
+    import numba
+    _HAS_NUMBA = _HAS_NUMPY
+except Exception:
+    _HAS_NUMBA = False
+
+try:
+    import cv2
+    _HAS_CV2 = _HAS_NUMPY
+except Exception:
+    _HAS_CV2 = False
+
+
+@functools.lru_cache(maxsize=8)
+def _pillow_vignette_mask(width: int, height: int, vig: float) -> Image.Image:
+    """'L' mask for _pillow_vignette, cached per (size, strength); treat as read-only."""
+    # Pillow's 256x256 radial gradient stores distance * sqrt(2) from the centre:
+    # edge midpoints read ~181 (normalized d = 1.0), corners saturate at 255.
+    grad = Image.radial_gradient('L').resize((width, height), Image.BILINEAR)
+    lut = [max(0, 255 - int(255 * min(1.0, (v / 181.0) * vig * 1.5))) for v in range(256)]
+    return grad.point(lut)
+
 
 def _pillow_vignette(img: Image.Image, vig: float) -> Image.Image:
+    # Paste through the mask onto black: what Image.composite does, minus the
+    # copy of the (black) background image it makes first
+    width, height = img.size
+    out = Image.new(img.mode, img.size, 0)
+    out.paste(img, None, _pillow_vignette_mask(width, height, round(vig, 2)))
+    return out
+
+
+# Rec. 601 luma weights shared by the Grayscale filter and saturation
+_LUMA = (0.2989, 0.5870, 0.1140)
+_LUMA_Q8 = (77, 150, 29)
+_SEPIA = (
+    (0.393, 0.769, 0.189),
+    (0.349, 0.686, 0.168),
+    (0.272, 0.534, 0.131),
+)
+# ImageOps.colorize(gray, '#704214', '#C0A080') as one 768-entry table for
+# Image.point, built once instead of on every Pillow-fallback Sepia render
+_SEPIA_TONE_LUT = [int(lo + (hi - lo) * i / 255)
+                   for lo, hi in ((0x70, 0xC0), (0x42, 0xA0), (0x14, 0x80))
+                   for i in range(256)]
+# Rows processed per pass of the fused NumPy pipeline
+_TILE_ROWS = 256
+# Rows per stripe when apply_edits_array streams a large image through all
+# stages, and the image height from which it does
+_STRIPE_ROWS = 512
+_STRIPE_MIN_ROWS = 1024
+# Vignette masks are cached for images up to this many pixels (previews); the
+# full-resolution masks of Apply, export and replay are built per call
+_MASK_CACHE_MAX_PIXELS = 1 << 21
+# Settings closer than this to their neutral value are skipped
+_NEUTRAL_EPS = 1e-3
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# Minimum rows per tile when splitting a PIL filter across threads
+_FILTER_TILE_ROWS = 128
+_filter_pool = None
+_filter_pool_lock = threading.Lock()
+# Recently decoded sources (content hash -> RGB pixels); previews and export
+# run on worker threads, hence the lock.
+_DECODE_CACHE_SIZE = 4
+_decode_cache = OrderedDict()
+_decode_lock = threading.Lock()
+
+
+def _filter_matrix(filt: str):
+    """Return the 3x3 channel-mix matrix for a colour filter, or None."""
+    if filt == 'Grayscale':
+        return np.array([_LUMA] * 3, dtype=np.float32)
+    if filt == 'Sepia':
+        return np.array(_SEPIA, dtype=np.float32)
+    return None
+
+
+def _channel_mix_u8(arr, matrix):
+    """Apply a 3x3 channel mix to a uint8 RGB array in Q8 fixed point.
+
+    Products are accumulated in int32 (sepia weights overflow int16) and the
+    result is clipped back to uint8.
+    """
+    q = np.rint(np.asarray(matrix) * 256.0).astype(np.int32)
+    r = arr[..., 0].astype(np.int32)
+    g = arr[..., 1].astype(np.int32)
+    b = arr[..., 2].astype(np.int32)
+    out = np.empty_like(arr)
+    acc = np.empty_like(r)
+    tmp = np.empty_like(r)
+    for i in range(3):
+        # accumulate in place: one scratch buffer instead of a temporary per term
+        np.multiply(r, q[i, 0], out=acc)
+        acc += np.multiply(g, q[i, 1], out=tmp)
+        acc += np.multiply(b, q[i, 2], out=tmp)
+        acc >>= 8
+        np.clip(acc, 0, 255, out=acc)
+        out[..., i] = acc
+    return out
+
+
+@functools.lru_cache(maxsize=16)
+def _tone_lut(bri: float, con: float, dtype=None):
+    """256-entry LUT for brightness followed by contrast.
+
+    The uint8 table is final output; a uint16 table keeps values above 255 so
+    a later vignette multiply can still pull highlights back into range, as
+    the float pipeline does. Cached per setting, so a preview only rebuilds it
+    when brightness or contrast actually changed.
+    """
+    dtype = dtype or np.uint8
+    levels = np.arange(256, dtype=np.float32)
+    high = 255 if dtype == np.uint8 else 65535
+    lut = np.clip((levels * bri - 128.0) * con + 128.0, 0, high).astype(dtype)
+    lut.flags.writeable = False
+    return lut
+
+
+def _radial_distance_rows(h: int, w: int, top: int = 0, rows=None):
+    """Distance from the centre in normalized [-1, 1] coordinates for rows
+    top..top+rows of an (h, w) image (all of it by default), shape (rows, w).
+
+    Squares are taken per axis and combined by broadcasting, so the only
+    full-size allocation is the float32 result, square-rooted in place.
+    """
+    ys = np.linspace(-1.0, 1.0, h, dtype=np.float32)
+    if rows is not None:
+        ys = ys[top:top + rows]
+    dy2 = np.square(ys)[:, None]
+    dx2 = np.square(np.linspace(-1.0, 1.0, w, dtype=np.float32))[None, :]
+    d = dy2 + dx2
+    np.sqrt(d, out=d)
+    return d
+
+
+@functools.lru_cache(maxsize=4)
+def _radial_distance(h: int, w: int):
+    """_radial_distance_rows for a whole preview-sized image, cached per shape."""
+    d = _radial_distance_rows(h, w)
+    d.flags.writeable = False
+    return d
+
+
+def _build_vignette_mask(h: int, w: int, vig: float, top: int = 0, rows=None):
+    """Float32 (rows, w, 1) darkening mask for rows top..top+rows of an (h, w)
+    image: 1 at the centre, falling towards the corners."""
+    if h * w <= _MASK_CACHE_MAX_PIXELS:
+        d = _radial_distance(h, w)
+        if rows is not None:
+            d = d[top:top + rows]
+        mask = d * np.float32(vig * 1.5)
+    else:
+        mask = _radial_distance_rows(h, w, top, rows)
+        mask *= np.float32(vig * 1.5)
+    np.clip(mask, 0.0, 1.0, out=mask)
+    np.subtract(1.0, mask, out=mask)
+    return mask[..., None]
+
+
+def _build_vignette_mask_q8(h: int, w: int, vig: float, top: int = 0, rows=None):
+    """_build_vignette_mask in Q8 fixed point (0..256) for uint16 multiplies."""
+    mask = _build_vignette_mask(h, w, vig, top, rows)
+    mask *= 256.0
+    return np.rint(mask, out=mask).astype(np.uint16)
+
+
+@functools.lru_cache(maxsize=8)
+def _vignette_mask(h: int, w: int, vig: float):
+    """_build_vignette_mask, cached per (h, w, vig).
+
+    Repeated previews of the same image only pay for the multiply; callers
+    round vig to slider resolution to keep keys stable.
+    """
+    mask = _build_vignette_mask(h, w, vig)
+    mask.flags.writeable = False
+    return mask
+
+
+@functools.lru_cache(maxsize=8)
+def _vignette_mask_q8(h: int, w: int, vig: float):
+    """_build_vignette_mask_q8, cached per (h, w, vig).
+
+    Built from an uncached float mask so the integer paths don't also pin a
+    float32 copy (2x the size) in the other cache.
+    """
+    mask = _build_vignette_mask_q8(h, w, vig)
+    mask.flags.writeable = False
+    return mask
+
+
+def _vignette_rows(h: int, w: int, vig: float, rows=None, q8: bool = False):
+    """Vignette mask for an (h, w) tile, float32 or Q8 (q8=True).
+
+    rows is (top, full height) of a stripe within the image, or None.
+    Preview-sized masks come from the caches, sliced for a stripe; larger
+    ones are built per call, and only for the rows the tile covers.
+    """
+    top, full_h = rows if rows is not None else (0, h)
+    if full_h * w <= _MASK_CACHE_MAX_PIXELS:
+        mask = _vignette_mask_q8(full_h, w, vig) if q8 else _vignette_mask(full_h, w, vig)
+        return mask[top:top + h]
+    build = _build_vignette_mask_q8 if q8 else _build_vignette_mask
+    return build(full_h, w, vig, top, h)
+
+
+@functools.lru_cache(maxsize=16)
+def _tone_table(bri: float, con: float):
+    """_tone_lut(bri, con) as a plain 256-entry list (float64, so within 1 level)
+    for Image.point without NumPy."""
+    return [int(min(255.0, max(0.0, (i * bri - 128.0) * con + 128.0))) for i in range(256)]
+
+
+def _take_lut(table, values):
+    """table[values] for a 256-entry table indexed by uint8 values.
+
+    OpenCV's LUT is a vectorized byte gather, several times faster than
+    NumPy fancy indexing; other inputs fall back to indexing.
+    """
+    if _HAS_CV2 and values.dtype == np.uint8:
+        return cv2.LUT(values, table)
+    return table[values]
+
+
+@functools.lru_cache(maxsize=16)
+def _adjust_coeffs(bri: float, con: float, sat: float):
+    """Brightness, contrast and saturation composed into one affine RGB map.
+
+    Returns a 12-tuple of row-major 3x4 coefficients (matrix | bias), the form
+    Image.convert('RGB', matrix) takes, so the Pillow fallback also applies all
+    three in one pass. Pure Python so it works without NumPy; cached per setting.
+    """
+    # brightness then contrast: ((x * bri) - 128) * con + 128
+    # saturation: gray + (x - gray) * sat  ==  S @ x
+    coeffs = []
+    for i in range(3):
+        row = [(sat if i == j else 0.0) + (1.0 - sat) * _LUMA[j] for j in range(3)]
+        coeffs += [v * bri * con for v in row]
+        coeffs.append(128.0 * (1.0 - con) * sum(row))
+    return tuple(coeffs)
+
+
+def _adjust_matrix(bri: float, con: float, sat: float):
+    """_adjust_coeffs as float32 arrays.
+
+    Returns (matrix, bias) so that out = rgb @ matrix.T + bias, or None when
+    all three adjustments are neutral.
+    """
+    if bri == 1.0 and con == 1.0 and sat == 1.0:
+        return None
+    m = np.array(_adjust_coeffs(bri, con, sat), dtype=np.float32).reshape(3, 4)
+    return np.ascontiguousarray(m[:, :3]), np.ascontiguousarray(m[:, 3])
+
+
+if _HAS_NUMBA:
+    _IDENTITY = np.eye(3, dtype=np.float32)
+    _ZERO_BIAS = np.zeros(3, dtype=np.float32)
+    _NO_MASK = np.ones((1, 1, 1), dtype=np.float32)
+    # Numba specializes on the read-only flag; cached masks are read-only, so
+    # match them here (src is passed as a read-only view for the same reason)
+    _NO_MASK.flags.writeable = False
+    _NO_LUT = np.zeros((3, 256), dtype=np.uint8)
+    _NO_LUT.flags.writeable = False
+
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _color_kernel(src, out, filt_m, use_filt, clip_filt, adj_m, adj_b, use_adj, mask, use_mask,
+                      lut, use_lut):
+        h, w = src.shape[0], src.shape[1]
+        for yy in numba.prange(h):
+            for xx in range(w):
+                r = np.float32(src[yy, xx, 0])
+                g = np.float32(src[yy, xx, 1])
+                b = np.float32(src[yy, xx, 2])
+                if use_filt:
+                    r, g, b = (filt_m[0, 0] * r + filt_m[0, 1] * g + filt_m[0, 2] * b,
+                               filt_m[1, 0] * r + filt_m[1, 1] * g + filt_m[1, 2] * b,
+                               filt_m[2, 0] * r + filt_m[2, 1] * g + filt_m[2, 2] * b)
+                    if clip_filt:
+                        r = min(max(r, 0.0), 255.0)
+                        g = min(max(g, 0.0), 255.0)
+                        b = min(max(b, 0.0), 255.0)
+                if use_adj:
+                    r, g, b = (adj_m[0, 0] * r + adj_m[0, 1] * g + adj_m[0, 2] * b + adj_b[0],
+                               adj_m[1, 0] * r + adj_m[1, 1] * g + adj_m[1, 2] * b + adj_b[1],
+                               adj_m[2, 0] * r + adj_m[2, 1] * g + adj_m[2, 2] * b + adj_b[2])
+                if use_mask:
+                    m = mask[yy, xx, 0]
+                    r *= m
+                    g *= m
+                    b *= m
+                r8 = np.uint8(min(max(r, 0.0), 255.0))
+                g8 = np.uint8(min(max(g, 0.0), 255.0))
+                b8 = np.uint8(min(max(b, 0.0), 255.0))
+                if use_lut:
+                    r8 = lut[0, r8]
+                    g8 = lut[1, g8]
+                    b8 = lut[2, b8]
+                out[yy, xx, 0] = r8
+                out[yy, xx, 1] = g8
+                out[yy, xx, 2] = b8
+
+
+def _apply_mask_q8(values, mask):
+    """Scale integer values by a Q8 vignette mask and clip to uint8 range.
+
+    uint8 input multiplies in uint16; wider (unclipped LUT) input in uint32.
+    """
+    wide = np.uint16 if values.dtype == np.uint8 else np.uint32
+    scaled = values.astype(wide)
+    scaled *= mask
+    scaled >>= 8
+    if wide is np.uint32:
+        np.minimum(scaled, 255, out=scaled)
+    return scaled
+
+
+def _color_gray(src, bri: float, con: float, vig: float, out=None, rows=None):
+    """Grayscale filter plus adjustments on a single luma plane.
+
+    Carrying one channel instead of three identical ones cuts the work of the
+    later stages by 3x; saturation is a no-op on gray pixels and is skipped.
+    The plane is expanded back to RGB once at the end, into out if given.
+    """
+    h, w = src.shape[:2]
+    # Q8 luma weights sum to 256, so the uint16 accumulator cannot overflow
+    gray = src[..., 0].astype(np.uint16)
+    gray *= _LUMA_Q8[0]
+    gray += src[..., 1].astype(np.uint16) * _LUMA_Q8[1]
+    gray += src[..., 2].astype(np.uint16) * _LUMA_Q8[2]
+    gray >>= 8
+    gray = gray.astype(np.uint8)
+    if vig and vig > 0.0:
+        if bri != 1.0 or con != 1.0:
+            gray = _take_lut(_tone_lut(bri, con, np.uint16), gray)
+        gray = _apply_mask_q8(gray, _vignette_rows(h, w, round(vig, 2), rows, q8=True)[..., 0])
+    elif bri != 1.0 or con != 1.0:
+        gray = _take_lut(_tone_lut(bri, con), gray)
+    if out is None:
+        out = np.empty_like(src)
+    out[...] = gray[..., None]
+    return out
+
+
+def _color_numpy(src, filt: str, bri: float, con: float, sat: float, vig: float, out=None,
+                 film: bool = False, rows=None):
+    """Colour filter, brightness/contrast/saturation and vignette on a uint8 RGB array.
+
+    Writes into out (same shape and dtype as src) when given. film applies the
+    Film curve to each tile while it is still in cache (see _color_numba);
+    rows places src within a taller image for the vignette (see _vignette_rows).
+    """
+    if filt == 'Grayscale':
+        return _color_gray(src, bri, con, vig, out, rows)
+    h, w = src.shape[:2]
+    filt_m = _filter_matrix(filt)
+    # Saturation mixes channels without clipping in between, so it keeps
+    # the float32 affine path; otherwise brightness/contrast is a uint8 LUT.
+    if sat != 1.0:
+        adjust = _adjust_matrix(bri, con, sat)
+        tone = None
+    elif bri != 1.0 or con != 1.0:
+        adjust = None
+        # unclipped uint16 table when the vignette still has to scale it
+        tone = _tone_lut(bri, con, np.uint16 if vig > 0.0 else np.uint8)
+    else:
+        adjust = None
+        tone = None
+    # Without a vignette between them, brightness/contrast and the Film
+    # curve compose into a single lookup per pixel
+    film_table = None
+    if film and tone is not None and not vig:
+        film_table = _film_tone_lut(bri, con)
+        tone = None
+
+    mask = None
+    if vig and vig > 0.0:
+        vig_key = round(vig, 2)
+        # Q8 fixed point on the integer path so the multiply stays in uint16
+        mask = _vignette_rows(h, w, vig_key, rows, q8=adjust is None)
+
+    # Run the pipeline over row tiles so intermediates stay cache-sized
+    # instead of spanning the whole image.
+    if out is None:
+        out = np.empty_like(src)
+    for r0 in range(0, h, _TILE_ROWS):
+        r1 = r0 + _TILE_ROWS
+        tile = src[r0:r1]
+        if filt_m is not None:
+            tile = _channel_mix_u8(tile, filt_m)
+        if adjust is not None:
+            ftile = tile @ adjust[0].T
+            ftile += adjust[1]
+            if mask is not None:
+                ftile *= mask[r0:r1]
+            np.clip(ftile, 0, 255, out=ftile)
+            if film:
+                _film_curve(ftile.astype(np.uint8), out[r0:r1])
+            else:
+                out[r0:r1] = ftile
+            continue
+        if tone is not None:
+            tile = _take_lut(tone, tile)
+        if mask is not None:
+            tile = _apply_mask_q8(tile, mask[r0:r1])
+        if film:
+            _film_curve(tile.astype(np.uint8, copy=False), out[r0:r1], film_table)
+        else:
+            out[r0:r1] = tile
+    return out
+
+
+def _color_numba(src, filt: str, bri: float, con: float, sat: float, vig: float, out=None,
+                 film: bool = False, rows=None):
+    """Numba counterpart of _color_numpy: one fused float32 pass, parallel over rows.
+
+    film folds the Film curve lookup into the same pass; only valid when
+    nothing else runs between the colour stage and the curve.
+    """
+    if filt == 'Grayscale':
+        return _color_gray(src, bri, con, vig, out, rows)
+    h, w = src.shape[:2]
+    filt_m = _filter_matrix(filt)
+    adjust = _adjust_matrix(bri, con, sat)
+    use_mask = bool(vig and vig > 0.0)
+    mask = _vignette_rows(h, w, round(vig, 2), rows) if use_mask else _NO_MASK
+    if out is None:
+        out = np.empty_like(src)
+    # Always hand the kernel a read-only source so writable and cached
+    # (read-only) inputs share one compiled specialization
+    src = np.ascontiguousarray(src).view()
+    src.flags.writeable = False
+    _color_kernel(
+        src, out,
+        filt_m if filt_m is not None else _IDENTITY, filt_m is not None, filt == 'Sepia',
+        adjust[0] if adjust is not None else _IDENTITY,
+        adjust[1] if adjust is not None else _ZERO_BIAS,
+        adjust is not None,
+        mask, use_mask,
+        _FILM_LUT_CH if film else _NO_LUT, film,
+    )
+    return out
+
+
+def warm_up():
+    """Compile (or load from Numba's on-disk cache) the JIT kernels ahead of use.
+
+    Call from a background thread at startup so the first preview doesn't pay
+    for compilation. A no-op without Numba.
+    """
+    if _HAS_NUMBA:
+        _color_numba(np.zeros((2, 2, 3), dtype=np.uint8), 'Sepia', 1.1, 1.1, 1.1, 0.5)
+
+
+@functools.lru_cache(maxsize=16)
+def _pillow_box_kernel(radius: float):
+    """1-D extended box kernel Pillow's GaussianBlur applies three times per axis.
+
+    Follows Pillow's _gaussian_blur_radius and ImagingHorizontalBoxBlur in
+    float32 and 24-bit fixed point, so the weights (ties included) are Pillow's.
+    """
+    f32 = np.float32
+    sigma2 = f32(f32(radius) * f32(radius) / f32(3))
+    size = f32(math.sqrt(12.0 * float(sigma2) + 1.0))
+    lo = f32(math.floor((float(size) - 1.0) / 2.0))
+    frac = f32((2 * lo + 1) * (lo * (lo + 1) - 3 * sigma2))
+    frac = f32(frac / f32(6 * (sigma2 - (lo + 1) * (lo + 1))))
+    box = f32(lo + frac)
+    inner = int(box)
+    ww = int(f32(f32(1 << 24) / f32(box * 2 + 1)))
+    fw = ((1 << 24) - (inner * 2 + 1) * ww) // 2
+    kernel = np.full(2 * inner + 3, ww / (1 << 24), dtype=np.float32)
+    kernel[0] = kernel[-1] = fw / (1 << 24)
+    kernel.flags.writeable = False
+    return kernel
+
+
+def _cv2_gaussian_blur(arr, radius: float):
+    """ImageFilter.GaussianBlur on a uint8 array with OpenCV (radius is the sigma).
+
+    Runs Pillow's three extended box passes per axis, horizontal first, each
+    clamping at the edges, rather than cv2.GaussianBlur's true Gaussian (up to
+    ~20 levels apart on thin lines and at borders). Only the per-pass rounding
+    differs from Pillow: at most 2 levels, on a few percent of pixels.
+    """
+    if radius == 0:
+        return arr.copy()
+    box = _pillow_box_kernel(float(radius))
+    one = np.ones(1, dtype=np.float32)
+    for _ in range(3):
+        arr = cv2.sepFilter2D(arr, -1, box, one, borderType=cv2.BORDER_REPLICATE)
+    for _ in range(3):
+        arr = cv2.sepFilter2D(arr, -1, one, box, borderType=cv2.BORDER_REPLICATE)
+    return arr
+
+
+def _cv2_sharpness(arr, shp: float, scale: float = 1.0):
+    """Adjustable sharpness on an array; mirrors _pil_sharpness.
+
+    Only the blur side runs on OpenCV. Sharpening stays on Pillow's
+    UnsharpMask: its threshold test turns _cv2_gaussian_blur's rounding into
+    differences of up to ~10 levels, ~30 once combined with the Sharpen filter.
+    """
+    if shp > 1.0:
+        return np.asarray(_pil_sharpness(_to_image(arr), shp, scale))
+    return _cv2_gaussian_blur(arr, (1.0 - shp) * 5 * scale)
+
+
+def _film_luts():
+    """Film curve as uint8 LUTs (red, green/blue), evaluated once per level."""
+    levels = np.arange(256, dtype=np.float32)
+    # simple contrast S-curve: scale, then gamma-like tweak; clamp at 0 so the
+    # gentle filmic gamma never sees a negative base
+    curve = np.maximum((levels - 128.0) * 1.08 + 128.0, 0.0)
+    curve = 255.0 * (curve / 255.0) ** 0.95
+    # warm midtones: add small bias to R channel
+    red = curve * 1.02 + 4.0
+    return (np.clip(red, 0, 255).astype(np.uint8),
+            np.clip(curve, 0, 255).astype(np.uint8))
+
+
+if _HAS_NUMPY:
+    _FILM_LUT_R, _FILM_LUT_GB = _film_luts()
+    # per-channel (R, G, B) table in the 1 x 256 x 3 layout cv2.LUT takes
+    _FILM_LUT_RGB = np.ascontiguousarray(
+        np.stack([_FILM_LUT_R, _FILM_LUT_GB, _FILM_LUT_GB], axis=-1)[None])
+    # one row per channel, for the fused Numba colour kernel
+    _FILM_LUT_CH = np.ascontiguousarray(_FILM_LUT_RGB[0].T)
+    _FILM_LUT_CH.flags.writeable = False
+
+
+@functools.lru_cache(maxsize=16)
+def _film_tone_lut(bri: float, con: float):
+    """Brightness/contrast followed by the Film curve, as one 1 x 256 x 3 table."""
+    table = np.ascontiguousarray(_FILM_LUT_RGB[:, _tone_lut(bri, con)])
+    table.flags.writeable = False
+    return table
+
+
+def _film_curve(arr, out=None, table=None):
+    """Film filter: slight S-curve + warm midtones as per-channel table lookups.
+
+    table replaces the plain curve with a composed one (see _film_tone_lut).
+    """
+    if out is None:
+        out = np.empty_like(arr)
+    if _HAS_CV2:
+        return cv2.LUT(arr, _FILM_LUT_RGB if table is None else table, dst=out)
+    if table is None:
+        out[..., 0] = _FILM_LUT_R[arr[..., 0]]
+        out[..., 1:] = _FILM_LUT_GB[arr[..., 1:]]
+    else:
+        for c in range(3):
+            out[..., c] = table[0, :, c][arr[..., c]]
+    return out
+
+
+def _snap(value: float, neutral: float) -> float:
+    """Treat slider values within _NEUTRAL_EPS of neutral as exactly neutral."""
+    return neutral if abs(value - neutral) <= _NEUTRAL_EPS else value
+
+
+def _filter_executor():
+    global _filter_pool
+    with _filter_pool_lock:
+        if _filter_pool is None:
+            _filter_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1,
+                                              thread_name_prefix='edits-filter')
+        return _filter_pool
+
+
+def _parallel_filter(img: Image.Image, flt) -> Image.Image:
+    """img.filter(flt) for GaussianBlur/UnsharpMask, split into row tiles on a thread pool.
+
+    Pillow releases the GIL while filtering, so tiles run concurrently. Each
+    tile is cropped with enough overlap to cover the blur's support, which
+    keeps the result identical to filtering the whole image at once.
+    """
+    workers = os.cpu_count() or 1
     width, height = img.size
-    vignette = Image.new('L', (width, height), 255)
-    for y in range(height):
-        for x in range(width):
-            dx = (x - width / 2) / (width / 2)
-            dy = (y - height / 2) / (height / 2)
-            d = (dx * dx + dy * dy) ** 0.5
-            val = 255 - int(255 * min(1.0, d * vig * 1.5))
-            vignette.putpixel((x, y), max(0, min(255, val)))
-    img.putalpha(vignette)
-    background = Image.new('RGB', img.size, (0, 0, 0))
-    background.paste(img, mask=img.split()[3])
-    return background
-
-
-def _numpy_vignette(img: Image.Image, vig: float) -> Image.Image:
-    # img is RGB
-    arr = np.asarray(img).astype(np.float32)
+    tiles = min(workers, height // _FILTER_TILE_ROWS)
+    if tiles < 2:
+        return img.filter(flt)
+    overlap = int(4 * flt.radius) + 2
+    step = -(-height // tiles)
+    bounds = [(y0, min(y0 + step, height)) for y0 in range(0, height, step)]
+
+    def run(rows):
+        y0, y1 = rows
+        top = max(0, y0 - overlap)
+        tile = img.crop((0, top, width, min(height, y1 + overlap))).filter(flt)
+        return tile.crop((0, y0 - top, width, y1 - top))
+
+    out = Image.new(img.mode, img.size)
+    for (y0, _), tile in zip(bounds, _filter_executor().map(run, bounds)):
+        out.paste(tile, (0, y0))
+    return out
+
+
+def _pil_sharpness(img: Image.Image, shp: float, scale: float = 1.0) -> Image.Image:
+    """Adjustable sharpness (1.0 = no change, <1.0 = blur, >1.0 = sharpen).
+
+    scale multiplies the filter radii (see apply_edits_array).
+    """
+    if shp > 1.0:
+        # Sharpen: use UnsharpMask with intensity based on sharpness value
+        # shp=1.5 → 50% sharp, shp=2.0 → 100% sharp
+        intensity = (shp - 1.0) * 200  # maps 1.0-2.0 to 0-200%
+        return _parallel_filter(img, ImageFilter.UnsharpMask(radius=2 * scale, percent=int(intensity), threshold=3))
+    # Blur: use GaussianBlur with radius based on how far below 1.0
+    # shp=0.5 → radius 2.5, shp=0 → radius 5
+    radius = (1.0 - shp) * 5 * scale
+    return _parallel_filter(img, ImageFilter.GaussianBlur(radius=radius))
+
+
+def _to_image(arr) -> Image.Image:
+    """Wrap a uint8 RGB array as a PIL image via frombuffer.
+
+    Pillow keeps RGB as 4-byte pixels, so one unpacking copy is unavoidable;
+    only non-contiguous arrays (e.g. slices) get an extra contiguous copy first.
+    """
+    if not arr.flags['C_CONTIGUOUS']:
+        arr = np.ascontiguousarray(arr)
     h, w = arr.shape[:2]
-    # normalized coordinates in range [-1,1]
-    y = np.linspace(-1.0, 1.0, h)[:, None]
-    x = np.linspace(-1.0, 1.0, w)[None, :]
-    d = np.sqrt(x * x + y * y)
-    # mask: 1 in center (larger untouched radius), decreased toward edges
-    # increased from 0.5 to 0.65 for even larger untouched center area
-    mask = 1.0 - np.clip((d - 0.65) * vig * 2.0, 0.0, 1.0)
-    mask = mask[..., None]
-    arr = arr * mask
-    arr = np.clip(arr, 0, 255).astype(np.uint8)
-    return Image.fromarray(arr)
-
-
-def apply_edits_bytes(image_bytes: bytes, settings: dict) -> bytes:
+    return Image.frombuffer('RGB', (w, h), arr, 'raw', 'RGB', 0, 1)
+
+
+def _decode_rgb(image_bytes: bytes):
+    """Decode image bytes to RGB, reusing recent results keyed by a content hash.
+
+    Returns a read-only uint8 array when NumPy is available, otherwise a PIL
+    image that callers must not modify in place.
+    """
+    key = hashlib.blake2b(image_bytes, digest_size=16).digest()
+    with _decode_lock:
+        decoded = _decode_cache.get(key)
+        if decoded is not None:
+            _decode_cache.move_to_end(key)
+            return decoded
+
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        # convert() copies even when the mode already matches
+        img.load()
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+    if _HAS_NUMPY:
+        decoded = np.asarray(img)
+        decoded.flags.writeable = False
+    else:
+        decoded = img
+
+    with _decode_lock:
+        _decode_cache[key] = decoded
+        while len(_decode_cache) > _DECODE_CACHE_SIZE:
+            _decode_cache.popitem(last=False)
+    return decoded
+
+
+def _read_settings(settings: dict):
+    """Return (filter, brightness, contrast, saturation, vignette, sharpness) with
+    values within _NEUTRAL_EPS of neutral snapped to it."""
+    return (
+        settings.get('filter', 'None'),
+        _snap(float(settings.get('brightness', 1.0)), 1.0),
+        _snap(float(settings.get('contrast', 1.0)), 1.0),
+        _snap(float(settings.get('saturation', 1.0)), 1.0),
+        _snap(float(settings.get('vignette', 0.0)), 0.0),
+        _snap(float(settings.get('sharpness', 1.0)), 1.0),
+    )
+
+
+def _edit_array(arr, filt: str, bri: float, con: float, sat: float, vig: float, shp: float,
+                scale: float = 1.0, out=None, rows=None):
+    """NumPy pipeline: returns a uint8 RGB array, never modifying arr in place.
+
+    out is a scratch buffer the colour stage writes into when it is the last
+    stage; the returned array may or may not be out. rows is set when arr is
+    a stripe of a taller image (see _edit_striped).
+    """
+    # Blur runs on OpenCV when available (within 2 levels of Pillow, see
+    # _cv2_gaussian_blur); Sharpen always uses Pillow's UnsharpMask
+    if filt == 'Blur':
+        arr = _cv2_gaussian_blur(arr, 2 * scale) if _HAS_CV2 else \
+            np.asarray(_parallel_filter(_to_image(arr), ImageFilter.GaussianBlur(radius=2 * scale)))
+    elif filt == 'Sharpen':
+        arr = np.asarray(_parallel_filter(_to_image(arr), ImageFilter.UnsharpMask(radius=2 * scale, percent=150, threshold=3)))
+
+    fuse_film = False
+    if filt in ('Grayscale', 'Sepia') or bri != 1.0 or con != 1.0 or sat != 1.0 or vig > 0.0:
+        # With no sharpness pass in between, the colour stage applies the
+        # Film curve itself rather than leaving it to another full pass
+        fuse_film = filt == 'Film' and shp == 1.0
+        if shp != 1.0 or (filt == 'Film' and not fuse_film) or (out is not None and out.shape != arr.shape):
+            out = None
+        if _HAS_NUMBA:
+            arr = _color_numba(arr, filt, bri, con, sat, vig, out, film=fuse_film, rows=rows)
+        else:
+            arr = _color_numpy(arr, filt, bri, con, sat, vig, out, film=fuse_film, rows=rows)
+
+    if shp != 1.0:
+        arr = _cv2_sharpness(arr, shp, scale) if _HAS_CV2 else np.asarray(_pil_sharpness(_to_image(arr), shp, scale))
+
+    # Additional 'Film' filter, unless the colour stage already applied it
+    if filt == 'Film' and not fuse_film:
+        arr = _film_curve(arr)
+    return arr
+
+
+def _stripe_halo(filt: str, shp: float, scale: float) -> int:
+    """Rows of context each stripe needs for the blur/sharpen stages to match
+    the whole-image result (the same margin _parallel_filter uses)."""
+    radii = []
+    if filt in ('Blur', 'Sharpen'):
+        radii.append(2 * scale)
+    if shp > 1.0:
+        radii.append(2 * scale)
+    elif shp < 1.0:
+        radii.append((1.0 - shp) * 5 * scale)
+    return sum(int(4 * r) + 2 for r in radii)
+
+
+def _edit_striped(arr, filt: str, bri: float, con: float, sat: float, vig: float, shp: float,
+                  scale: float = 1.0, out=None):
+    """_edit_array one row stripe at a time, through every stage.
+
+    Each stripe stays in cache from the first stage to the last instead of
+    every stage streaming the whole image through memory, and intermediates
+    are stripe-sized. Stripes carry enough extra rows for the spatial
+    filters, so the result is identical to _edit_array on the whole image.
+    """
+    h = arr.shape[0]
+    halo = _stripe_halo(filt, shp, scale)
+    if out is None or out.shape != arr.shape:
+        out = np.empty_like(arr)
+    for y0 in range(0, h, _STRIPE_ROWS):
+        y1 = min(y0 + _STRIPE_ROWS, h)
+        top, bottom = max(0, y0 - halo), min(h, y1 + halo)
+        # point-wise stages only: let the colour stage write straight into out
+        dst = out[y0:y1] if halo == 0 else None
+        edited = _edit_array(arr[top:bottom], filt, bri, con, sat, vig, shp,
+                             scale=scale, out=dst, rows=(top, h))
+        if edited is not dst:
+            out[y0:y1] = edited[y0 - top:y1 - top]
+    return out
+
+
+def _edit_image(img: Image.Image, filt: str, bri: float, con: float, sat: float, vig: float, shp: float) -> Image.Image:
+    """Pillow-only pipeline used when NumPy is unavailable.
+
+    Grayscale stays a single 'L' band throughout (saturation is a no-op on it)
+    and is returned as such; PNG stores it at a third of the RGB size.
+    """
+    if filt == 'Blur':
+        img = _parallel_filter(img, ImageFilter.GaussianBlur(radius=2))
+    elif filt == 'Sharpen':
+        img = _parallel_filter(img, ImageFilter.UnsharpMask(radius=2, percent=150, threshold=3))
+    elif filt == 'Grayscale':
+        img = ImageOps.grayscale(img)
+    elif filt == 'Sepia':
+        img = ImageOps.grayscale(img).convert('RGB').point(_SEPIA_TONE_LUT)
+
+    if img.mode == 'RGB' and sat != 1.0:
+        # one matrix conversion instead of three ImageEnhance passes
+        img = img.convert('RGB', _adjust_coeffs(bri, con, sat))
+    elif bri != 1.0 or con != 1.0:
+        # brightness and contrast alone are one table lookup per band
+        img = img.point(_tone_table(bri, con) * len(img.getbands()))
+
+    if vig and vig > 0.0:
+        try:
+            img = _pillow_vignette(img, vig)
+        except Exception:
+            pass
+
+    if shp != 1.0:
+        img = _pil_sharpness(img, shp)
+
+    # Additional 'Film' filter: pillow fallback increases contrast and color slightly
+    if filt == 'Film':
+        try:
+            img = _pillow_film(img)
+        except Exception:
+            pass
+    return img
+
+
+def _pillow_film(img: Image.Image) -> Image.Image:
+    """Pillow fallback Film look: contrast 1.08 about the mean luma, colour 1.05
+    and a 2% red lift (warm tint).
+
+    All three are affine in the pixel values, so they fold into one
+    Image.convert('RGB', matrix) pass; the ImageEnhance chain this replaces
+    took five full-image passes plus a split and merge.
+    """
+    con, sat, warm = 1.08, 1.05, (1.02, 1.0, 1.0)
+    # mean luma from the per-channel means, as ImageEnhance.Contrast rounds it
+    means = ImageStat.Stat(img).mean
+    mean = int(sum(w * m for w, m in zip(_LUMA, means)) + 0.5)
+    coeffs = []
+    for i in range(3):
+        # contrast: c*x + (1-c)*mean; colour: s*x + (1-s)*luma(x)
+        row = [con * ((sat if i == j else 0.0) + (1.0 - sat) * _LUMA[j]) for j in range(3)]
+        coeffs += [v * warm[i] for v in row]
+        coeffs.append((1.0 - con) * mean * warm[i])
+    return img.convert('RGB', tuple(coeffs))
+
+
+def is_neutral(settings: dict) -> bool:
+    """True when settings would leave the image unchanged."""
+    filt, bri, con, sat, vig, shp = _read_settings(settings)
+    return filt == 'None' and bri == 1.0 and con == 1.0 and sat == 1.0 and vig <= 0.0 and shp == 1.0
+
+
+def apply_edits_array(arr, settings: dict, scale: float = 1.0, out=None):
+    """Apply the same edits as apply_edits_bytes to a uint8 H x W x 3 RGB array.
+
+    Skips PNG decode and encode entirely, which is what interactive previews
+    want. The input is never modified; it is returned as-is when every setting
+    is neutral. Requires NumPy.
+
+    scale is the size of arr relative to the full image (e.g. 0.25 for a
+    quarter-size preview); blur and sharpen radii are scaled by it so a
+    downscaled preview looks like the full-resolution result.
+
+    out is an optional preallocated uint8 array of arr's shape that the result
+    may be written into, so repeated previews can reuse one buffer instead of
+    allocating per call. Always use the return value; out is only a hint.
+
+    Tall images (exports, Apply) are processed in row stripes, see _edit_striped.
+    """
+    if not _HAS_NUMPY:
+        raise RuntimeError('apply_edits_array requires NumPy')
+    if arr.shape[0] >= _STRIPE_MIN_ROWS and not is_neutral(settings):
+        return _edit_striped(arr, *_read_settings(settings), scale=scale, out=out)
+    return _edit_array(arr, *_read_settings(settings), scale=scale, out=out)
+
+
+def encode_png(arr, compress_level: int = 1) -> bytes:
+    """Encode a uint8 RGB array as PNG bytes (see apply_edits_bytes for compress_level)."""
+    out = io.BytesIO()
+    write_png(arr, out, compress_level)
+    return out.getvalue()
+
+
+def write_png(arr, fp, compress_level: int = 1):
+    """Encode a uint8 RGB array as PNG straight into fp (a path or binary file).
+
+    Pillow writes chunk by chunk, so no second in-memory copy of the PNG is made.
+    """
+    _to_image(arr).save(fp, format='PNG', compress_level=compress_level, optimize=False)
+
+
+def apply_edits_bytes(image_bytes: bytes, settings: dict, compress_level: int = 1) -> bytes:
     """Apply filters and adjustments to image bytes and return PNG bytes.
 
+    compress_level is the PNG deflate level: the default 1 keeps interactive
+    previews fast; pass 6-9 for final exports where file size matters.
+
     settings keys:
       - filter: name ('None','Grayscale','Sepia','Blur','Sharpen')
       - brightness: float (e.g., 1.0)
@@ -56,134 +884,23 @@ def apply_edits_bytes(image_bytes: bytes, settings: dict) -> bytes:
       - vignette: float (0.0-1.0)
       - sharpness: float (0.0-2.0, default 1.0 = no change)
     """
-    bio = io.BytesIO(image_bytes)
+    # Nothing to do: hand PNG input straight back without a decode/encode cycle
+    if is_neutral(settings) and image_bytes[:8] == _PNG_SIGNATURE:
+        return image_bytes
 
-    # For filters that are simple convolutions (Blur/Sharpen) we use PIL first,
-    # otherwise prefer a fast NumPy pipeline for color math if available.
-    filt = settings.get('filter', 'None')
-    if filt in ('Blur', 'Sharpen'):
-        img = Image.open(bio).convert('RGB')
-        if filt == 'Blur':
-            img = img.filter(ImageFilter.GaussianBlur(radius=2))
-        else:
-            img = img.filter(ImageFilter.UnsharpMask(radius=2, percent=150, threshold=3))
-        # continue with numpy or pillow adjustments below using this img
-    else:
-        img = Image.open(bio).convert('RGB')
+    filt, bri, con, sat, vig, shp = _read_settings(settings)
 
-    bri = float(settings.get('brightness', 1.0))
-    con = float(settings.get('contrast', 1.0))
-    sat = float(settings.get('saturation', 1.0))
-    vig = float(settings.get('vignette', 0.0))
-    shp = float(settings.get('sharpness', 1.0))
+    # Decoded pixels are cached by content, so repeated previews of the
+    # same source skip the decode.
+    decoded = _decode_rgb(image_bytes)
 
     if _HAS_NUMPY:
-        arr = np.asarray(img).astype(np.float32)
-
-        # Grayscale
-        if filt == 'Grayscale':
-            gray = arr[..., 0] * 0.2989 + arr[..., 1] * 0.5870 + arr[..., 2] * 0.1140
-            arr[..., 0] = gray
-            arr[..., 1] = gray
-            arr[..., 2] = gray
-        # Sepia
-        elif filt == 'Sepia':
-            r = arr[..., 0].copy()
-            g = arr[..., 1].copy()
-            b = arr[..., 2].copy()
-            tr = 0.393 * r + 0.769 * g + 0.189 * b
-            tg = 0.349 * r + 0.686 * g + 0.168 * b
-            tb = 0.272 * r + 0.534 * g + 0.131 * b
-            arr[..., 0] = np.clip(tr, 0, 255)
-            arr[..., 1] = np.clip(tg, 0, 255)
-            arr[..., 2] = np.clip(tb, 0, 255)
-
-        # Brightness (scale)
-        if bri != 1.0:
-            arr = arr * bri
-
-        # Contrast: scale relative to midpoint 128
-        if con != 1.0:
-            arr = (arr - 128.0) * con + 128.0
-
-        # Saturation: interpolate between gray and color
-        if sat != 1.0:
-            gray = arr[..., 0] * 0.2989 + arr[..., 1] * 0.5870 + arr[..., 2] * 0.1140
-            gray = gray[..., None]
-            arr = gray + (arr - gray) * sat
-
-        # Vignette (use numpy method)
-        if vig and vig > 0.0:
-            h, w = arr.shape[:2]
-            y = np.linspace(-1.0, 1.0, h)[:, None]
-            x = np.linspace(-1.0, 1.0, w)[None, :]
-            d = np.sqrt(x * x + y * y)
-            mask = 1.0 - np.clip(d * vig * 1.5, 0.0, 1.0)
-            mask = mask[..., None]
-            arr = arr * mask
-
-        arr = np.clip(arr, 0, 255).astype(np.uint8)
-        img = Image.fromarray(arr)
+        # Array-native from decode to encode: the only PIL conversion is the
+        # one right before saving (plus PIL filters when OpenCV is missing).
+        img = _to_image(_edit_array(decoded, filt, bri, con, sat, vig, shp))
     else:
-        # Fallback to Pillow pipeline
-        # Filters already applied for Blur/Sharpen; apply other filters
-        if filt == 'Grayscale':
-            img = ImageOps.grayscale(img).convert('RGB')
-        elif filt == 'Sepia':
-            img = ImageOps.colorize(ImageOps.grayscale(img), '#704214', '#C0A080')
-
-        if bri != 1.0:
-            img = ImageEnhance.Brightness(img).enhance(bri)
-        if con != 1.0:
-            img = ImageEnhance.Contrast(img).enhance(con)
-        if sat != 1.0:
-            img = ImageEnhance.Color(img).enhance(sat)
-
-        if vig and vig > 0.0:
-            try:
-                img = _pillow_vignette(img, vig)
-            except Exception:
-                pass
-
-    # Apply adjustable sharpness (1.0 = no change, <1.0 = blur, >1.0 = sharpen)
-    if shp != 1.0:
-        if shp > 1.0:
-            # Sharpen: use UnsharpMask with intensity based on sharpness value
-            # shp=1.5 → 50% sharp, shp=2.0 → 100% sharp
-            intensity = (shp - 1.0) * 200  # maps 1.0-2.0 to 0-200%
-            img = img.filter(ImageFilter.UnsharpMask(radius=2, percent=int(intensity), threshold=3))
-        elif shp < 1.0:
-            # Blur: use GaussianBlur with radius based on how far below 1.0
-            # shp=0.5 → radius 2.5, shp=0 → radius 5
-            radius = (1.0 - shp) * 5
-            img = img.filter(ImageFilter.GaussianBlur(radius=radius))
-
-    # Additional 'Film' filter: slight S-curve + warm midtones
-    filt = settings.get('filter', 'None')
-    if filt == 'Film':
-        try:
-            # apply a lightweight S-curve via numpy if available
-            if _HAS_NUMPY:
-                arr = np.asarray(img).astype(np.float32)
-                # simple contrast S-curve: scale, then gamma-like tweak
-                arr = (arr - 128.0) * 1.08 + 128.0
-                # gentle filmic gamma
-                arr = 255.0 * (arr / 255.0) ** 0.95
-                # warm midtones: add small bias to R channel
-                arr[..., 0] = np.clip(arr[..., 0] * 1.02 + 4.0, 0, 255)
-                arr = np.clip(arr, 0, 255).astype(np.uint8)
-                img = Image.fromarray(arr)
-            else:
-                # pillow fallback: increase contrast and color slightly
-                img = ImageEnhance.Contrast(img).enhance(1.08)
-                img = ImageEnhance.Color(img).enhance(1.05)
-                # warm tint
-                r, g, b = img.split()
-                r = ImageEnhance.Brightness(r).enhance(1.02)
-                img = Image.merge('RGB', (r, g, b))
-        except Exception:
-            pass
+        img = _edit_image(decoded, filt, bri, con, sat, vig, shp)
 
     out = io.BytesIO()
-    img.save(out, format='PNG')
+    img.save(out, format='PNG', compress_level=compress_level, optimize=False)
     return out.getvalue()
@@ -6,42 +6,94 @@
 #
 
 import os
+import contextlib
+import itertools
 import json
 import tempfile
 import time
 import urllib.parse
+from collections import OrderedDict, deque
 from pathlib import Path
 from PySide6 import QtCore, QtGui, QtWidgets
 from PySide6.QtCore import Qt
-import api
 from PIL import Image
 import io
-import edits
+import numpy as np
+# api (google-genai) and edits (NumPy kernels, optional Numba/OpenCV) are slow
+# to import, so they are imported where first used to get the window up sooner.
 
 
-class ImageWorker(QtCore.QObject):
+def _array_to_qimage(arr: np.ndarray) -> QtGui.QImage:
+    """Wrap a uint8 RGB array as a QImage without copying the pixels.
+
+    The QImage points into the array's buffer, so the array is kept alive on
+    the returned object; Qt detaches into its own copy if it is ever written.
+    """
+    arr = np.ascontiguousarray(arr)
+    h, w = arr.shape[:2]
+    img = QtGui.QImage(arr.data, w, h, arr.strides[0], QtGui.QImage.Format_RGB888)
+    img._array = arr
+    return img
+
+
+@contextlib.contextmanager
+def _signals_blocked(*widgets):
+    """Block the widgets' signals for the with-block, restoring the previous
+    state even if the block raises."""
+    saved = [w.blockSignals(True) for w in widgets]
+    try:
+        yield
+    finally:
+        for w, was_blocked in zip(widgets, saved):
+            w.blockSignals(was_blocked)
+
+
+def _warm_up_edits():
+    # Runs on a worker thread: pays for importing edits and JIT-compiling its kernels
+    import edits
+    edits.warm_up()
+
+
+def _decode_array(data: bytes) -> np.ndarray:
+    """Decode image bytes to a read-only uint8 RGB array."""
+    with Image.open(io.BytesIO(data)) as img:
+        # convert() copies even when the mode already matches
+        img.load()
+        arr = np.asarray(img if img.mode == 'RGB' else img.convert('RGB'))
+    arr.flags.writeable = False
+    return arr
+
+
+class ImageSignals(QtCore.QObject):
     finished = QtCore.Signal(bytes, str)  # data, model
     # emit exception objects so caller can inspect type
     error = QtCore.Signal(object)
 
+
+class ImageWorker(QtCore.QRunnable):
+    # Runs on the global thread pool: no QThread to build and tear down per generation
     def __init__(self, prompt: str, aspect_ratio: str = "1:1"):
         super().__init__()
+        self.signals = ImageSignals()
         self.prompt = prompt
         self.aspect_ratio = aspect_ratio
 
-    @QtCore.Slot()
     def run(self):
         try:
+            import api
             data, model_used = api.generate_image(self.prompt, self.aspect_ratio)
             if not data:
                 raise RuntimeError("No image bytes returned")
-            self.finished.emit(data, model_used)
+            self.signals.finished.emit(data, model_used)
         except Exception as e:
             # Emit the actual exception object so GUI can react (e.g. billing)
-            self.error.emit(e)
+            self.signals.error.emit(e)
 
 
 class MainWindow(QtWidgets.QMainWindow):
+    # Queued to the long-lived export worker: (image ndarray, settings, path)
+    _start_export = QtCore.Signal(object, dict, str)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Gemini ImageGen")
@@ -51,6 +103,19 @@ class MainWindow(QtWidgets.QMainWindow):
         self.setMinimumSize(600, 400)
 
         self.current_pixmap = None
+        self._drag_active = False  # fast pixmap scaling, see _update_image_label
+        self._scaled_key = None  # (label size, pixmap cacheKey, transform) last shown
+        # The original image as bytes and/or a decoded RGB array; edits keep it
+        # as an array and PNG bytes are only produced when something asks
+        self._original_image_bytes = None
+        self._orig_array = None
+        # Pixmaps of recent image states (id(pixels) -> (pixels, QPixmap)),
+        # so undo/redo/reset don't decode PNG on the GUI thread every time
+        self._pixmap_cache = OrderedDict()
+        # Last preview frame; encoded to PNG only if something asks for bytes
+        self._preview_image = None
+        # PNG bytes of what is shown, when they already exist (see _write_current_image)
+        self.edited_image_bytes = None
 
         central = QtWidgets.QWidget()
         self.setCentralWidget(central)
@@ -113,7 +178,8 @@ class MainWindow(QtWidgets.QMainWindow):
         self.image_label.setMinimumSize(300, 200)
         self.image_label.setStyleSheet("background: #202020; border: 1px solid #333;")
         layout.addWidget(self.image_label, stretch=1)
-        self._load_startup_image()
+        # Decode the placeholder after the window is up rather than before first paint
+        QtCore.QTimer.singleShot(0, self._load_startup_image)
 
         # Edit panel using grid layout for compact arrangement
         edit_grid = QtWidgets.QGridLayout()
@@ -181,6 +247,33 @@ class MainWindow(QtWidgets.QMainWindow):
         # Initially disable edit controls until an image is loaded
         self._set_edit_controls_enabled(False)
 
+        # Plain-dict snapshot of the edit controls, kept current by their signals
+        # (connected before the preview triggers so it is updated first)
+        self._settings = {
+            'filter': self.filter_combo.currentText(),
+            'brightness': self.brightness_slider.value() / 100.0,
+            'contrast': self.contrast_slider.value() / 100.0,
+            'saturation': self.saturation_slider.value() / 100.0,
+            'vignette': self.vignette_slider.value() / 100.0,
+            'sharpness': self.sharpness_slider.value() / 100.0,
+        }
+        self.filter_combo.currentTextChanged.connect(lambda t: self._settings.__setitem__('filter', t))
+        for key, slider in (('brightness', self.brightness_slider), ('contrast', self.contrast_slider),
+                            ('saturation', self.saturation_slider), ('vignette', self.vignette_slider),
+                            ('sharpness', self.sharpness_slider)):
+            slider.valueChanged.connect(lambda v, k=key: self._settings.__setitem__(k, v / 100.0))
+
+        # While a slider or the window is being dragged, scale the displayed
+        # pixmap with the cheap nearest-neighbour filter; repaint smoothly after
+        self._smooth_repaint_timer = QtCore.QTimer(self)
+        self._smooth_repaint_timer.setSingleShot(True)
+        self._smooth_repaint_timer.setInterval(150)
+        self._smooth_repaint_timer.timeout.connect(self._end_fast_scaling)
+        for slider in (self.brightness_slider, self.contrast_slider, self.saturation_slider,
+                       self.vignette_slider, self.sharpness_slider):
+            slider.sliderPressed.connect(self._begin_fast_scaling)
+            slider.sliderReleased.connect(self._end_fast_scaling)
+
         # Connect edit controls (once)
         self.apply_edits_btn.clicked.connect(self._apply_edits_to_original)
         self.reset_edits_btn.clicked.connect(self._reset_edits)
@@ -192,7 +285,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.saturation_slider.valueChanged.connect(self._schedule_preview)
         self.vignette_slider.valueChanged.connect(self._schedule_preview)
         self.sharpness_slider.valueChanged.connect(self._schedule_preview)
-        self.preset_combo.currentIndexChanged.connect(lambda _: (self._apply_preset(self.preset_combo.currentText()), self._schedule_preview()))
+        self.preset_combo.currentIndexChanged.connect(lambda _: self._apply_preset(self.preset_combo.currentText()))
 
         # Bottom actions
         bottom_layout = QtWidgets.QHBoxLayout()
@@ -228,30 +321,71 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self._apply_dark_theme()
 
-        # Keep references for preview/export threads so we can avoid leaking
-        self._preview_thread = None
-        self._preview_worker = None
+        # One export thread and worker, created on first export and reused after
         self._export_thread = None
         self._export_worker = None
-        self._export_path = None  # Store export path for the worker callback
         self._last_model_used = ""
-        # Undo / redo stacks hold bytes of the 'original' image (full resolution)
-        self._undo_stack = []  # list[bytes]
-        self._redo_stack = []  # list[bytes]
-        # Debounce timer for preview updates to avoid flooding worker threads
+        # The 'original' image is a base image (generated, loaded or cropped)
+        # plus the settings of each applied edit. Undo / redo stacks hold those
+        # (base_bytes, applied_settings, pixels) states rather than full-resolution
+        # PNGs: every entry shares the one base, and the decoded pixels that let a
+        # step skip the replay are dropped from the oldest states once they no
+        # longer fit in _undo_budget bytes.
+        self._base_image_bytes = None
+        self._applied_edits = ()  # tuple[dict, ...]
+        # Bounded: the oldest steps fall off once the limit is reached.
+        self._undo_stack = deque(maxlen=20)  # deque[tuple[bytes, tuple[dict, ...], ndarray | None]]
+        self._redo_stack = deque(maxlen=20)
+        self._undo_budget = 512 * 1024 * 1024
+        # Throttle window for preview updates: at most one preview starts per
+        # interval while controls change, plus a trailing one when it ends
         self._preview_timer = QtCore.QTimer()
         self._preview_timer.setSingleShot(True)
-        # Slightly longer debounce to avoid thread storms while dragging
-        self._preview_timer.setInterval(200)  # milliseconds
+        self._preview_timer.setInterval(120)  # milliseconds
         self._preview_timer.timeout.connect(self._start_preview_worker)
-        # Preview state to avoid overlapping threads
+        # Previews run on a dedicated single-thread pool: no per-preview thread
+        # setup/teardown, and at most one edit in flight at a time
+        self._preview_pool = QtCore.QThreadPool(self)
+        self._preview_pool.setMaxThreadCount(1)
+        # JIT-compile the edit kernels now, ahead of the first preview in the same queue
+        self._preview_pool.start(_warm_up_edits)
+        # Preview state to avoid overlapping runs
         self._preview_running = False
         self._preview_pending_settings = None
-        self._preview_thread = None
         self._preview_worker = None
         self._preview_token_counter = 0
         self._active_preview_token = -1
+        # (source array, size, settings) of the preview shown or being rendered
+        self._preview_key = None
+        # Recent finished previews of the current source, so scrubbing a slider
+        # back to a value it has already shown needs no worker run:
+        # (size, settings items) -> QImage
+        self._preview_cache = OrderedDict()
+        self._preview_cache_source = None
+        # (source array, size, downscaled source) reused by every preview until
+        # the original or the preview size changes
+        self._preview_base = None
+        # Full-resolution Apply in flight, if any
+        self._apply_worker = None
+        # Undo/redo replay of a state whose pixels were trimmed, if any
+        self._replay_worker = None
         
+        # Prompt history is written at most once per second, off the generate path
+        self._history_save_timer = QtCore.QTimer(self)
+        self._history_save_timer.setSingleShot(True)
+        self._history_save_timer.setInterval(1000)
+        self._history_save_timer.timeout.connect(self._save_prompt_history)
+
+        # Data file paths are resolved (and their directory created) once, not on every save
+        self._history_file = self._get_history_file_path()
+        self._settings_file = self._get_settings_file_path()
+        try:
+            self._history_file.parent.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            print(f'Failed to create app data directory: {e}')
+
+        # Prompt history, oldest first (newest at the end, shown at the top of the combo)
+        self._prompt_history = OrderedDict()
         # Load prompt history from disk
         self._load_prompt_history()
         
@@ -259,60 +393,226 @@ class MainWindow(QtWidgets.QMainWindow):
         self._load_app_settings()
         
         # Connect controls to save settings when changed (AFTER loading to prevent overwrites)
-        self.lens_type.currentIndexChanged.connect(self._save_app_settings)
-        self.focal_length.currentIndexChanged.connect(self._save_app_settings)
-        self.aspect_ratio.currentIndexChanged.connect(self._save_app_settings)
-        self.highres_checkbox.stateChanged.connect(self._save_app_settings)
-
-    class ThumbnailWorker(QtCore.QObject):
-        finished = QtCore.Signal(int, bytes)  # token, data
-        error = QtCore.Signal(int, object)    # token, exc
-
-        def __init__(self, token: int, image_bytes: bytes, settings: dict, max_size: int = 512):
+        # Debounced, so a burst of changes is written once
+        self._settings_save_timer = QtCore.QTimer(self)
+        self._settings_save_timer.setSingleShot(True)
+        self._settings_save_timer.setInterval(500)
+        self._settings_save_timer.timeout.connect(self._save_app_settings)
+        # (lambdas: the signals' int argument would pick the start(msec) overload)
+        self.lens_type.currentIndexChanged.connect(lambda _: self._settings_save_timer.start())
+        self.focal_length.currentIndexChanged.connect(lambda _: self._settings_save_timer.start())
+        self.aspect_ratio.currentIndexChanged.connect(lambda _: self._settings_save_timer.start())
+        self.highres_checkbox.stateChanged.connect(lambda _: self._settings_save_timer.start())
+
+    class ThumbnailSignals(QtCore.QObject):
+        finished = QtCore.Signal(int, object)  # token, QImage
+        error = QtCore.Signal(int, object)     # token, exc
+        base_ready = QtCore.Signal(object)     # (source, max_size, downscaled source)
+
+    class ThumbnailWorker(QtCore.QRunnable):
+        # Previews run one at a time on a single-thread pool and each result is
+        # copied by convertToFormat before it is emitted, so all of them can
+        # share one output buffer instead of allocating per preview
+        _scratch = None
+
+        def __init__(self, token: int, image: np.ndarray, settings: dict, max_size: int = 512,
+                     base: np.ndarray = None):
             super().__init__()
+            # QRunnable is not a QObject, so signals live on a helper object
+            self.signals = MainWindow.ThumbnailSignals()
             self.token = token
-            self.image_bytes = image_bytes
+            self.image = image
             self.settings = settings
             self.max_size = max_size
+            # image already downscaled to max_size by an earlier preview, if any
+            self.base = base
 
-        @QtCore.Slot()
         def run(self):
             try:
-                # Downscale for preview to keep the pipeline light
-                img = Image.open(io.BytesIO(self.image_bytes)).convert('RGB')
-                w, h = img.size
-                if max(w, h) > self.max_size:
-                    scale = self.max_size / float(max(w, h))
-                    new_w = int(w * scale)
-                    new_h = int(h * scale)
-                    img = img.resize((new_w, new_h), Image.LANCZOS)
-                buf = io.BytesIO()
-                img.save(buf, format='PNG')
-                buf.seek(0)
-                resized_bytes = buf.getvalue()
-
-                edited = edits.apply_edits_bytes(resized_bytes, self.settings)
-                self.finished.emit(self.token, edited)
+                arr = self.base
+                if arr is None:
+                    # Downscale first so every edit pass runs on preview-sized pixels.
+                    # Done once per image and size: the result is handed back so
+                    # later previews start from it.
+                    arr = self.image
+                    if max(arr.shape[:2]) > self.max_size:
+                        img = Image.fromarray(arr)
+                        # reducing_gap: box-reduce most of the way, LANCZOS only for the rest
+                        img.thumbnail((self.max_size, self.max_size), Image.LANCZOS, reducing_gap=2.0)
+                        arr = np.asarray(img)
+                        arr.flags.writeable = False
+                    self.signals.base_ready.emit((self.image, self.max_size, arr))
+
+                # Pixels in, pixels out: no PNG encode here and no decode on the GUI side.
+                # Filter radii shrink with the thumbnail so blur/sharpen match the export.
+                import edits
+                scale = arr.shape[1] / self.image.shape[1]
+                scratch = MainWindow.ThumbnailWorker._scratch
+                if scratch is None or scratch.shape != arr.shape:
+                    scratch = MainWindow.ThumbnailWorker._scratch = np.empty_like(arr)
+                edited = edits.apply_edits_array(arr, self.settings, scale=scale, out=scratch)
+                # Convert to the pixmap's native 32-bit layout here, off the GUI
+                # thread, so QPixmap.fromImage there can share the pixels as-is
+                image = _array_to_qimage(edited).convertToFormat(QtGui.QImage.Format_RGB32)
+                self.signals.finished.emit(self.token, image)
             except Exception as e:
-                self.error.emit(self.token, e)
+                self.signals.error.emit(self.token, e)
 
-    class FullExportWorker(QtCore.QObject):
-        finished = QtCore.Signal(bytes)
+    class ApplySignals(QtCore.QObject):
+        finished = QtCore.Signal(object)  # edited full-resolution ndarray
         error = QtCore.Signal(object)
 
-        def __init__(self, image_bytes: bytes, settings: dict):
+    class ApplyWorker(QtCore.QRunnable):
+        # Full-resolution Apply, queued on the preview pool so it stays off the GUI thread
+        def __init__(self, image: np.ndarray, settings: dict):
             super().__init__()
-            self.image_bytes = image_bytes
+            self.signals = MainWindow.ApplySignals()
+            self.image = image
             self.settings = settings
 
-        @QtCore.Slot()
         def run(self):
             try:
-                edited = edits.apply_edits_bytes(self.image_bytes, self.settings)
-                self.finished.emit(edited)
+                import edits
+                self.signals.finished.emit(edits.apply_edits_array(self.image, self.settings))
+            except Exception as e:
+                self.signals.error.emit(e)
+
+    class ReplayWorker(QtCore.QRunnable):
+        # Rebuilds an undo/redo state whose pixels were trimmed by replaying its
+        # edits at full resolution, on the preview pool like ApplyWorker
+        def __init__(self, state: tuple, start: np.ndarray, settings: tuple, undo: bool, origin: tuple):
+            super().__init__()
+            self.signals = MainWindow.ApplySignals()
+            self.state = state
+            self.start = start  # None: decode the state's base image
+            self.settings = settings
+            self.undo = undo
+            self.origin = origin  # (base, applied) current when the step was asked for
+
+        def run(self):
+            try:
+                import edits
+                arr = self.start if self.start is not None else _decode_array(self.state[0])
+                for settings in self.settings:
+                    arr = edits.apply_edits_array(arr, settings)
+                self.signals.finished.emit(arr)
+            except Exception as e:
+                self.signals.error.emit(e)
+
+    class FullExportWorker(QtCore.QObject):
+        finished = QtCore.Signal(str)  # path written
+        error = QtCore.Signal(object)
+
+        @QtCore.Slot(object, dict, str)
+        def run(self, image: np.ndarray, settings: dict, path: str):
+            try:
+                # Final export: the only PNG encode, so spend the time on a smaller file
+                import edits
+                edited = edits.apply_edits_array(image, settings)
+                # Write from this thread too, so big files on slow disks don't block the GUI.
+                # QSaveFile only replaces the target once everything is written (a failed
+                # write makes commit() fail), and Pillow encodes into it chunk by chunk, so
+                # the whole PNG is never held in memory.
+                out = QtCore.QSaveFile(path)
+                if not out.open(QtCore.QIODevice.WriteOnly):
+                    raise OSError(out.errorString())
+                edits.write_png(edited, out, compress_level=6)
+                if not out.commit():
+                    raise OSError(out.errorString())
+                self.finished.emit(path)
             except Exception as e:
                 self.error.emit(e)
 
+    @property
+    def original_image_bytes(self):
+        # Encoded lazily (and once) when the original only exists as an array
+        if self._original_image_bytes is None and self._orig_array is not None:
+            import edits
+            self._original_image_bytes = edits.encode_png(self._orig_array)
+        return self._original_image_bytes
+
+    @original_image_bytes.setter
+    def original_image_bytes(self, data):
+        if data is not self._original_image_bytes:
+            self._orig_array = None
+        self._original_image_bytes = data
+
+    def _has_image(self) -> bool:
+        return self._original_image_bytes is not None or self._orig_array is not None
+
+    def _set_original_array(self, arr: np.ndarray):
+        # New original from the edit pipeline: no PNG until one is needed
+        arr.flags.writeable = False
+        self._orig_array = arr
+        self._original_image_bytes = None
+        self.edited_image_bytes = None
+        self._preview_image = None
+
+    def _original_array(self) -> np.ndarray:
+        """Decoded RGB pixels of original_image_bytes, decoded once per image."""
+        if self._orig_array is None:
+            self._orig_array = _decode_array(self._original_image_bytes)
+        return self._orig_array
+
+    def _pixmap_for(self, data: np.ndarray) -> QtGui.QPixmap:
+        """QPixmap for a uint8 RGB array, reusing recent results.
+
+        Keyed by object identity; the entry keeps a reference to the array so
+        the id cannot be recycled while cached.
+        """
+        key = id(data)
+        entry = self._pixmap_cache.get(key)
+        if entry is not None and entry[0] is data:
+            self._pixmap_cache.move_to_end(key)
+            return entry[1]
+        pix = QtGui.QPixmap.fromImage(_array_to_qimage(data))
+        if not pix.isNull():
+            self._pixmap_cache[key] = (data, pix)
+            while len(self._pixmap_cache) > 8:
+                self._pixmap_cache.popitem(last=False)
+        return pix
+
+    def _original_pixmap(self) -> QtGui.QPixmap:
+        """Unedited full-resolution pixmap of the original image, or a null
+        pixmap if it can't be decoded."""
+        # Always from the decoded pixels, which previews and Apply need too:
+        # one decode serves both instead of a Qt decode for the display
+        # followed by another for the edit pipeline
+        try:
+            return self._pixmap_for(self._original_array())
+        except Exception:
+            return QtGui.QPixmap()
+
+    def _load_original(self, image_bytes: bytes, arr: np.ndarray = None) -> QtGui.QPixmap:
+        """Make image_bytes the original, decoding it once for both the display
+        and the edit pipeline. Returns a null pixmap if it can't be decoded.
+
+        arr is the decoded RGB pixels when the caller already has them.
+        """
+        try:
+            if arr is None:
+                arr = _decode_array(image_bytes)
+            arr.flags.writeable = False
+        except Exception:
+            return QtGui.QPixmap()
+        self.original_image_bytes = image_bytes
+        self._orig_array = arr
+        return self._original_pixmap()
+
+    def _show_original(self):
+        # Display the original itself; current image bytes follow it lazily
+        self.current_pixmap = self._original_pixmap()
+        self.edited_image_bytes = self._original_image_bytes
+        self._preview_image = None
+        self._preview_key = None
+        # a preview still in flight would overwrite this with a stale image
+        self._active_preview_token = -1
+        self._update_image_label()
+
+    def _current_settings(self) -> dict:
+        # Copy, so workers and the undo history each own what they were given
+        return dict(self._settings)
+
     def _apply_dark_theme(self):
         # Minimal dark stylesheet
         self.setStyleSheet("""
@@ -323,6 +623,9 @@ class MainWindow(QtWidgets.QMainWindow):
         """)
 
     def _load_startup_image(self):
+        # Deferred: an image may already have been generated or loaded
+        if self._has_image():
+            return
         try:
             startup_path = Path(__file__).resolve().parent / "startup.png"
             if startup_path.exists():
@@ -333,10 +636,11 @@ class MainWindow(QtWidgets.QMainWindow):
                     return
             # fallback: clear
             self.current_pixmap = None
-            self.image_label.setPixmap(QtGui.QPixmap())
+            self._update_image_label()
         except Exception:
             pass
 
+    @QtCore.Slot()
     def on_generate(self):
         # read prompt from the editable combo
         prompt = self.prompt_combo.currentText().strip()
@@ -382,29 +686,23 @@ class MainWindow(QtWidgets.QMainWindow):
         # remember last base prompt for history (add on successful generation)
         self._last_prompt = prompt
 
-        self.thread = QtCore.QThread()
-        self.worker = ImageWorker(augmented_prompt, aspect_ratio)
-        self.worker.moveToThread(self.thread)
-        self.thread.started.connect(self.worker.run)
-        self.worker.finished.connect(self._on_image_ready)
-        self.worker.error.connect(self._on_error)
-        self.worker.finished.connect(self.thread.quit)
-        self.worker.error.connect(self.thread.quit)
-        self.thread.finished.connect(self.thread.deleteLater)
-        self.thread.start()
+        worker = ImageWorker(augmented_prompt, aspect_ratio)
+        worker.signals.finished.connect(self._on_image_ready)
+        worker.signals.error.connect(self._on_error)
+        # Keep the Python wrapper (and its signals object) alive until the next generation
+        self.worker = worker
+        QtCore.QThreadPool.globalInstance().start(worker)
         # disable edit controls until image arrives
         self._set_edit_controls_enabled(False)
 
+    @QtCore.Slot(bytes, str)
     def _on_image_ready(self, image_bytes: bytes, model_name: str):
-        pix = QtGui.QPixmap()
-        ok = pix.loadFromData(image_bytes)
-        if not ok:
+        pix = self._load_original(image_bytes)
+        if pix.isNull():
             self._on_error("Failed to load image data")
             return
         self.current_pixmap = pix
         self._last_model_used = model_name
-        # store original bytes for edits
-        self.original_image_bytes = image_bytes
         self.edited_image_bytes = image_bytes
         # add prompt to history (if available)
         try:
@@ -413,9 +711,7 @@ class MainWindow(QtWidgets.QMainWindow):
         except Exception:
             pass
         # clear undo/redo when a brand new image arrives
-        self._undo_stack.clear()
-        self._redo_stack.clear()
-        self._update_undo_redo_buttons()
+        self._set_base_image(image_bytes)
         # enable edit controls
         self._set_edit_controls_enabled(True)
         self._update_image_label()
@@ -432,6 +728,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.copy_btn.setEnabled(True)
         self.crop_btn.setEnabled(True)
 
+    @QtCore.Slot(object)
     def _on_error(self, exc: object):
         # Hide progress on error
         self.progress.setVisible(False)
@@ -463,20 +760,38 @@ class MainWindow(QtWidgets.QMainWindow):
             QtWidgets.QMessageBox.critical(self, "Generation error", message)
 
         self.generate_btn.setEnabled(True)
-        self.save_btn.setEnabled(self.current_pixmap is not None)
+        self.save_btn.setEnabled(self._has_image())
 
     def resizeEvent(self, event: QtGui.QResizeEvent):
         super().resizeEvent(event)
+        # fast scaling while the resize is in progress, one smooth pass once it settles
+        self._drag_active = True
+        self._update_image_label()
+        self._smooth_repaint_timer.start()
+
+    @QtCore.Slot()
+    def _begin_fast_scaling(self):
+        self._drag_active = True
+
+    @QtCore.Slot()
+    def _end_fast_scaling(self):
+        self._drag_active = False
         self._update_image_label()
 
     def _update_image_label(self):
         if self.current_pixmap:
-            scaled = self.current_pixmap.scaled(
-                self.image_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
-            )
+            mode = Qt.FastTransformation if self._drag_active else Qt.SmoothTransformation
+            size = self.image_label.size()
+            # Resizes that don't change the label (or repeat calls) skip the rescale
+            key = (size.width(), size.height(), self.current_pixmap.cacheKey(), mode)
+            if key == self._scaled_key:
+                return
+            scaled = self.current_pixmap.scaled(size, Qt.KeepAspectRatio, mode)
             self.image_label.setPixmap(scaled)
+            self._scaled_key = key
         else:
             self.image_label.setPixmap(QtGui.QPixmap())
+            self._scaled_key = None
 
     def _set_edit_controls_enabled(self, enabled: bool):
         self.filter_combo.setEnabled(enabled)
@@ -490,167 +805,207 @@ class MainWindow(QtWidgets.QMainWindow):
 
     def _preview_edits(self):
         # Apply edits to original image and show preview (non-destructive)
-        if not getattr(self, 'original_image_bytes', None):
+        if not self._has_image():
             return
         # Build settings from controls
-        settings = {
-            'filter': self.filter_combo.currentText(),
-            'brightness': self.brightness_slider.value() / 100.0,
-            'contrast': self.contrast_slider.value() / 100.0,
-            'saturation': self.saturation_slider.value() / 100.0,
-            'vignette': self.vignette_slider.value() / 100.0,
-            'sharpness': self.sharpness_slider.value() / 100.0,
-        }
+        settings = self._current_settings()
+
+        import edits
+        if edits.is_neutral(settings):
+            # Nothing to edit: show the original without a worker round-trip and
+            # drop any queued or in-flight preview
+            self._preview_pending_settings = None
+            self._active_preview_token = -1
+            self._show_original()
+            return
+
+        key = self._preview_key
+        if key is not None and key[0] is self._orig_array and key[1:] == (self._preview_max_size(), settings):
+            # Already showing (or rendering) exactly this; drop anything queued behind it
+            self._preview_pending_settings = None
+            return
+
+        cached = self._cached_preview(settings)
+        if cached is not None:
+            # Rendered before: show it now and retire anything queued or in flight
+            self._preview_pending_settings = None
+            self._active_preview_token = -1
+            self._preview_key = (self._orig_array, self._preview_max_size(), settings)
+            self._show_preview(cached)
+            return
 
         # If a preview is already running, store the latest settings and let the current run finish
-        if getattr(self, '_preview_running', False):
+        if self._preview_running:
             self._preview_pending_settings = settings
             return
+        self._start_preview(settings)
 
-        try:
-            self._preview_running = True
-            self._preview_pending_settings = None
+    def _start_preview(self, settings: dict):
+        self._preview_running = True
+        self._preview_pending_settings = None
 
-            self._preview_token_counter += 1
-            token = self._preview_token_counter
-            self._active_preview_token = token
-
-            # clean up old thread objects
-            if getattr(self, '_preview_thread', None) is not None:
-                try:
-                    self._preview_thread.quit()
-                    self._preview_thread.wait(50)
-                except Exception:
-                    pass
-
-            self._preview_thread = QtCore.QThread()
-            self._preview_worker = MainWindow.ThumbnailWorker(token, self.original_image_bytes, settings, max_size=640)
-            self._preview_worker.moveToThread(self._preview_thread)
-            self._preview_thread.started.connect(self._preview_worker.run)
-            self._preview_worker.finished.connect(self._on_preview_ready)
-            self._preview_worker.error.connect(self._on_preview_error)
-            self._preview_worker.finished.connect(self._preview_thread.quit)
-            self._preview_worker.error.connect(self._preview_thread.quit)
-            self._preview_thread.finished.connect(self._preview_thread.deleteLater)
-            self._preview_thread.finished.connect(self._clear_preview_thread)
-            self._preview_thread.start()
+        self._preview_token_counter += 1
+        token = self._preview_token_counter
+        self._active_preview_token = token
+
+        try:
+            source = self._original_array()
+            max_size = self._preview_max_size()
+            self._preview_key = (source, max_size, settings)
+            base = self._preview_base
+            if base is not None and base[0] is source and base[1] == max_size:
+                base = base[2]
+            else:
+                base = None
+            worker = MainWindow.ThumbnailWorker(token, source, settings, max_size=max_size, base=base)
+            worker.signals.finished.connect(self._on_preview_ready)
+            worker.signals.error.connect(self._on_preview_error)
+            worker.signals.base_ready.connect(self._on_preview_base_ready)
+            # Keep the Python wrapper (and its signals object) alive until the next preview
+            self._preview_worker = worker
+            self._preview_pool.start(worker)
         except Exception as e:
             self._preview_running = False
-            print('Edit preview failed (thread):', e)
+            self._preview_key = None
+            print('Edit preview failed (pool):', e)
+
+    def _cached_preview(self, settings: dict):
+        if self._preview_cache_source is not self._orig_array:
+            return None
+        key = (self._preview_max_size(), tuple(sorted(settings.items())))
+        image = self._preview_cache.get(key)
+        if image is not None:
+            self._preview_cache.move_to_end(key)
+        return image
+
+    def _cache_preview(self, source: np.ndarray, max_size: int, settings: dict, image: QtGui.QImage):
+        if self._preview_cache_source is not source:
+            # New original: the old previews (and the array they pin) can go
+            self._preview_cache.clear()
+            self._preview_cache_source = source
+        self._preview_cache[(max_size, tuple(sorted(settings.items())))] = image
+        while len(self._preview_cache) > 16:
+            self._preview_cache.popitem(last=False)
+
+    def _start_pending_preview(self):
+        # If new settings arrived while running, kick off another preview
+        self._preview_running = False
+        if self._preview_pending_settings:
+            self._start_preview(self._preview_pending_settings)
+
+    def _preview_max_size(self) -> int:
+        # Previews never need more pixels than the label can show on this screen.
+        # Rounded up to a multiple of 64 so small window resizes keep hitting the
+        # cached base and previews instead of downscaling the source again.
+        size = self.image_label.size()
+        target = int(max(size.width(), size.height()) * self.image_label.devicePixelRatioF())
+        return max(256, -(-target // 64) * 64)
 
+    @QtCore.Slot()
     def _schedule_preview(self):
-        # restart debounce timer; actual preview work runs when timer fires
-        try:
-            self._preview_timer.start()
-        except Exception:
-            # fallback: run immediately
+        # Leading + trailing throttle: the first change after a quiet period
+        # previews right away and opens a window; changes inside the window
+        # only wait for the timer, which previews the latest settings. A drag
+        # therefore updates every interval instead of only after release, and
+        # the trailing run is free when nothing changed (see _preview_edits).
+        if self._preview_timer.isActive():
+            return
+        if not self._preview_running:
             self._preview_edits()
+        self._preview_timer.start()
 
+    @QtCore.Slot()
     def _start_preview_worker(self):
         # Timer callback: start the heavy preview worker
         self._preview_edits()
 
-    def _clear_preview_thread(self):
-        self._preview_thread = None
-
-    def _on_preview_ready(self, token: int, edited_bytes: bytes):
-        # Ignore stale previews
+    @QtCore.Slot(int, object)
+    def _on_preview_ready(self, token: int, image: QtGui.QImage):
+        # Ignore stale previews, but the pool is free again either way
         if token != self._active_preview_token:
+            self._start_pending_preview()
             return
         try:
-            pix = QtGui.QPixmap()
-            if pix.loadFromData(edited_bytes):
-                self.current_pixmap = pix
-                self._update_image_label()
-                self.edited_image_bytes = edited_bytes
+            if self._show_preview(image) and self._preview_key is not None:
+                self._cache_preview(*self._preview_key, image)
         except Exception as e:
             print('Preview apply failed:', e)
         finally:
-            self._preview_running = False
-            # If new settings arrived while running, kick off another preview
-            if self._preview_pending_settings:
-                pending = self._preview_pending_settings
-                self._preview_pending_settings = None
-                # Re-run with pending settings
-                self._preview_running = True
-                try:
-                    if getattr(self, '_preview_thread', None) is not None:
-                        try:
-                            self._preview_thread.quit()
-                            self._preview_thread.wait(50)
-                        except Exception:
-                            pass
-
-                    self._preview_token_counter += 1
-                    token = self._preview_token_counter
-                    self._active_preview_token = token
-
-                    self._preview_thread = QtCore.QThread()
-                    self._preview_worker = MainWindow.ThumbnailWorker(token, self.original_image_bytes, pending, max_size=640)
-                    self._preview_worker.moveToThread(self._preview_thread)
-                    self._preview_thread.started.connect(self._preview_worker.run)
-                    self._preview_worker.finished.connect(self._on_preview_ready)
-                    self._preview_worker.error.connect(self._on_preview_error)
-                    self._preview_worker.finished.connect(self._preview_thread.quit)
-                    self._preview_worker.error.connect(self._preview_thread.quit)
-                    self._preview_thread.finished.connect(self._preview_thread.deleteLater)
-                    self._preview_thread.finished.connect(self._clear_preview_thread)
-                    self._preview_thread.start()
-                except Exception as e:
-                    self._preview_running = False
-                    print('Preview restart failed:', e)
+            self._start_pending_preview()
+
+    def _show_preview(self, image: QtGui.QImage) -> bool:
+        pix = QtGui.QPixmap.fromImage(image)
+        if pix.isNull():
+            return False
+        self.current_pixmap = pix
+        self._update_image_label()
+        self._preview_image = image
+        self.edited_image_bytes = None
+        return True
+
+    @QtCore.Slot(object)
+    def _on_preview_base_ready(self, entry: tuple):
+        self._preview_base = entry
 
+    @QtCore.Slot(int, object)
     def _on_preview_error(self, token: int, exc: object):
         # Ignore stale results
         if token != self._active_preview_token:
+            self._start_pending_preview()
             return
         print('Preview worker error:', exc)
-        self._preview_running = False
-        if self._preview_pending_settings:
-            # Try again with the most recent pending settings
-            pending = self._preview_pending_settings
-            self._preview_pending_settings = None
-            self._preview_running = True
-            try:
-                if getattr(self, '_preview_thread', None) is not None:
-                    try:
-                        self._preview_thread.quit()
-                        self._preview_thread.wait(50)
-                    except Exception:
-                        pass
-
-                self._preview_token_counter += 1
-                new_token = self._preview_token_counter
-                self._active_preview_token = new_token
-
-                self._preview_thread = QtCore.QThread()
-                self._preview_worker = MainWindow.ThumbnailWorker(new_token, self.original_image_bytes, pending, max_size=640)
-                self._preview_worker.moveToThread(self._preview_thread)
-                self._preview_thread.started.connect(self._preview_worker.run)
-                self._preview_worker.finished.connect(self._on_preview_ready)
-                self._preview_worker.error.connect(self._on_preview_error)
-                self._preview_worker.finished.connect(self._preview_thread.quit)
-                self._preview_worker.error.connect(self._preview_thread.quit)
-                self._preview_thread.finished.connect(self._preview_thread.deleteLater)
-                self._preview_thread.finished.connect(self._clear_preview_thread)
-                self._preview_thread.start()
-            except Exception as e:
-                self._preview_running = False
-                print('Preview retry failed:', e)
+        self._preview_key = None
+        # Try again with the most recent pending settings, if any
+        self._start_pending_preview()
 
+    @QtCore.Slot()
     def _apply_edits_to_original(self):
-        # Finalize edits (already applied to preview), keep edited bytes as original for subsequent edits
-        if getattr(self, 'edited_image_bytes', None):
-            # push current original to undo stack, then replace
-            try:
-                self._undo_stack.append(self.original_image_bytes)
-                # clear redo stack on new change
-                self._redo_stack.clear()
-            except Exception:
-                pass
-            self.original_image_bytes = self.edited_image_bytes
-            self._update_undo_redo_buttons()
-            self.status_label.setText('Edits applied to the image')
+        # Finalize edits: re-run them at full resolution (the preview is downscaled)
+        # on the preview pool and keep the result as original for subsequent edits
+        if not self._has_image() or self._apply_worker is not None or self._replay_worker is not None:
+            return
+        try:
+            worker = MainWindow.ApplyWorker(self._original_array(), self._current_settings())
+            worker.signals.finished.connect(self._on_apply_ready)
+            worker.signals.error.connect(self._on_apply_error)
+            self._apply_worker = worker
+            self.apply_edits_btn.setEnabled(False)
+            self.status_label.setText('Applying edits...')
+            self._preview_pool.start(worker)
+        except Exception as e:
+            self._apply_worker = None
+            self.apply_edits_btn.setEnabled(True)
+            print('Apply edits failed:', e)
+
+    @QtCore.Slot(object)
+    def _on_apply_ready(self, edited: np.ndarray):
+        worker, self._apply_worker = self._apply_worker, None
+        self.apply_edits_btn.setEnabled(self.filter_combo.isEnabled())
+        if worker is None or worker.image is not self._orig_array:
+            # The original changed meanwhile (new image, undo, ...): drop the result
+            return
+        # previews still queued behind the apply were made from the old original
+        self._active_preview_token = -1
+        # push current state to undo stack, then record the new edit
+        try:
+            self._undo_stack.append(self._history_state())
+            # clear redo stack on new change
+            self._redo_stack.clear()
+            self._trim_history_pixels()
+        except Exception:
+            pass
+        self._applied_edits += (worker.settings,)
+        self._set_original_array(edited)
+        self._show_original()
+        self._update_undo_redo_buttons()
+        self.status_label.setText('Edits applied to the image')
+
+    @QtCore.Slot(object)
+    def _on_apply_error(self, exc: object):
+        self._apply_worker = None
+        self.apply_edits_btn.setEnabled(self.filter_combo.isEnabled())
+        self.status_label.setText('Applying edits failed')
+        print('Apply edits failed:', exc)
 
     def _apply_preset(self, preset_name: str):
         # Map presets to slider/filter settings
@@ -664,19 +1019,31 @@ class MainWindow(QtWidgets.QMainWindow):
 
         if preset_name == 'Custom' or preset_name not in presets:
             return
-        p = presets[preset_name]
-        # set control values (these will trigger preview)
-        self.filter_combo.setCurrentText(p.get('filter', 'None'))
-        self.brightness_slider.setValue(p.get('brightness', 100))
-        self.contrast_slider.setValue(p.get('contrast', 100))
-        self.saturation_slider.setValue(p.get('saturation', 100))
-        self.vignette_slider.setValue(p.get('vignette', 0))
-        self.sharpness_slider.setValue(p.get('sharpness', 100))
-        
+        self._set_edit_controls(presets[preset_name])
+        self._schedule_preview()
+
+    def _set_edit_controls(self, p: dict):
+        # Missing keys fall back to neutral values
+        sliders = {
+            'brightness': (self.brightness_slider, 100),
+            'contrast': (self.contrast_slider, 100),
+            'saturation': (self.saturation_slider, 100),
+            'vignette': (self.vignette_slider, 0),
+            'sharpness': (self.sharpness_slider, 100),
+        }
+        # Set all controls with signals blocked and update the settings snapshot
+        # directly; callers then preview once instead of once per control
+        with _signals_blocked(self.filter_combo, *(slider for slider, _ in sliders.values())):
+            self.filter_combo.setCurrentText(p.get('filter', 'None'))
+            self._settings['filter'] = self.filter_combo.currentText()
+            for key, (slider, default) in sliders.items():
+                slider.setValue(p.get(key, default))
+                self._settings[key] = slider.value() / 100.0
 
+    @QtCore.Slot()
     def on_export_full(self):
         # Ask for path first, then run full-resolution export in background
-        if not getattr(self, 'original_image_bytes', None):
+        if not self._has_image():
             return
         default_dir = QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.PicturesLocation) or os.path.expanduser("~/Pictures")
         path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export full resolution", default_dir, "PNG Files (*.png)")
@@ -686,14 +1053,7 @@ class MainWindow(QtWidgets.QMainWindow):
             path += '.png'
 
         # Build settings
-        settings = {
-            'filter': self.filter_combo.currentText(),
-            'brightness': self.brightness_slider.value() / 100.0,
-            'contrast': self.contrast_slider.value() / 100.0,
-            'saturation': self.saturation_slider.value() / 100.0,
-            'vignette': self.vignette_slider.value() / 100.0,
-            'sharpness': self.sharpness_slider.value() / 100.0,
-        }
+        settings = self._current_settings()
 
         # disable UI controls while exporting
         self.export_btn.setEnabled(False)
@@ -702,60 +1062,43 @@ class MainWindow(QtWidgets.QMainWindow):
         self.progress.setRange(0, 0)
         self.progress.setVisible(True)
 
-        # start export thread
+        # queue the job on the export thread
         try:
-            if self._export_thread is not None:
-                try:
-                    self._export_thread.quit()
-                    self._export_thread.wait(50)
-                except Exception:
-                    pass
-
-            self._export_thread = QtCore.QThread()
-            self._export_worker = MainWindow.FullExportWorker(self.original_image_bytes, settings)
-            self._export_path = path  # Store path for the callback
-            self._export_worker.moveToThread(self._export_thread)
-            self._export_thread.started.connect(self._export_worker.run)
-            # Connect signals to methods directly (avoid lambda capture issues with QueuedConnection)
-            self._export_worker.finished.connect(self._handle_export_finished, QtCore.Qt.QueuedConnection)
-            self._export_worker.error.connect(self._handle_export_error, QtCore.Qt.QueuedConnection)
-            # DirectConnection for quit to avoid reparenting issues
-            self._export_worker.finished.connect(self._export_thread.quit, QtCore.Qt.DirectConnection)
-            self._export_worker.error.connect(self._export_thread.quit, QtCore.Qt.DirectConnection)
-            self._export_thread.finished.connect(self._export_thread.deleteLater)
-            self._export_thread.start()
+            if self._export_thread is None:
+                self._export_thread = QtCore.QThread()
+                self._export_worker = MainWindow.FullExportWorker()
+                self._export_worker.moveToThread(self._export_thread)
+                self._start_export.connect(self._export_worker.run, QtCore.Qt.QueuedConnection)
+                # Connect signals to methods directly (avoid lambda capture issues with QueuedConnection)
+                self._export_worker.finished.connect(self._handle_export_finished, QtCore.Qt.QueuedConnection)
+                self._export_worker.error.connect(self._handle_export_error, QtCore.Qt.QueuedConnection)
+                self._export_thread.start()
+            self._start_export.emit(self._original_array(), settings, path)
         except Exception as e:
             QtWidgets.QMessageBox.critical(self, 'Export failed', str(e))
             self.export_btn.setEnabled(True)
             self.save_btn.setEnabled(True)
             self.progress.setVisible(False)
 
-    def _handle_export_finished(self, data: bytes):
-        """Wrapper to call _on_export_finished with stored path."""
+    @QtCore.Slot(str)
+    def _handle_export_finished(self, path: str):
+        """Wrapper to call _on_export_finished."""
         #print(f'[GUI] _handle_export_finished called')
-        self._on_export_finished(data, self._export_path)
+        self._on_export_finished(path)
 
+    @QtCore.Slot(object)
     def _handle_export_error(self, exc: object):
         """Wrapper to call _on_export_error."""
         #print(f'[GUI] _handle_export_error called')
         self._on_export_error(exc)
 
-    def _on_export_finished(self, data: bytes, path: str):
-        #print(f'[GUI] _on_export_finished called with {len(data)} bytes, writing to {path}')
-        try:
-            with open(path, 'wb') as f:
-                f.write(data)
-            self.status_label.setText(f'Exported to {path}')
-            #print(f'[GUI] File written')
-        except Exception as e:
-            #print(f'[GUI] Export error: {e}')
-            self.status_label.setText('Export save failed')
-            QtWidgets.QMessageBox.critical(self, 'Export save failed', str(e))
-        finally:
-            #print(f'[GUI] Finalizing export UI')
-            self.progress.setVisible(False)
-            self.export_btn.setEnabled(True)
-            self.save_btn.setEnabled(True)
+    def _on_export_finished(self, path: str):
+        # The worker has already written the file; only the UI is left to update
+        #print(f'[GUI] _on_export_finished called for {path}')
+        self.status_label.setText(f'Exported to {path}')
+        self.progress.setVisible(False)
+        self.export_btn.setEnabled(True)
+        self.save_btn.setEnabled(True)
 
     def _on_export_error(self, exc: object):
         #print(f'[GUI] _on_export_error called: {exc}')
@@ -765,110 +1108,219 @@ class MainWindow(QtWidgets.QMainWindow):
         self.export_btn.setEnabled(True)
         self.save_btn.setEnabled(True)
 
+    @QtCore.Slot()
     def _reset_edits(self):
-        if getattr(self, 'original_image_bytes', None):
-            # reset sliders and filter
-            self.filter_combo.setCurrentIndex(0)
-            self.brightness_slider.setValue(100)
-            self.contrast_slider.setValue(100)
-            self.saturation_slider.setValue(100)
-            self.vignette_slider.setValue(0)
-            self.sharpness_slider.setValue(100)
+        if self._has_image():
+            # reset sliders and filter at once, so no intermediate state gets previewed
+            self._set_edit_controls({})
             # restore original image
             # Resetting is considered a change: push current to undo and clear redo
             try:
-                self._undo_stack.append(self.original_image_bytes)
+                self._undo_stack.append(self._history_state())
                 self._redo_stack.clear()
+                self._trim_history_pixels()
             except Exception:
                 pass
-            pix = QtGui.QPixmap()
-            pix.loadFromData(self.original_image_bytes)
-            self.current_pixmap = pix
-            self.edited_image_bytes = self.original_image_bytes
-            self._update_image_label()
+            self._show_original()
             self._update_undo_redo_buttons()
 
-    def _push_state_and_apply(self, new_bytes: bytes):
-        # Helper to push current original to undo and set new original
+    def _set_base_image(self, image_bytes: bytes):
+        # A brand new base image starts a fresh edit history
+        self._base_image_bytes = image_bytes
+        self._applied_edits = ()
+        self._undo_stack.clear()
+        self._redo_stack.clear()
+        self._update_undo_redo_buttons()
+
+    def _history_state(self) -> tuple:
+        # Decoded pixels (when present) travel with the state so stepping
+        # back to it needs neither a PNG decode nor a replay
+        return (self._base_image_bytes, self._applied_edits, self._orig_array)
+
+    def _restore_history_state(self, state: tuple):
+        base, applied, pixels = state
+        self._base_image_bytes = base
+        self._applied_edits = applied
+        self.original_image_bytes = base
+        # States with applied edits but no pixels are rebuilt by _step_history first
+        if pixels is not None:
+            if applied:
+                self._set_original_array(pixels)
+            else:
+                self._orig_array = pixels
+        self._show_original()
+
+    def _replay_anchor(self, base: bytes, applied: tuple) -> tuple:
+        """(pixels, count) for the longest prefix of applied whose result is
+        still held by a history state (or the current one); (None, 0) if the
+        base image itself has to be decoded."""
+        best = None
+        states = itertools.chain(self._undo_stack, self._redo_stack, (self._history_state(),))
+        for s_base, s_applied, pixels in states:
+            n = len(s_applied)
+            if (pixels is not None and s_base is base and n <= len(applied)
+                    and (best is None or n > best[1]) and applied[:n] == s_applied):
+                best = (pixels, n)
+        return best if best is not None else (None, 0)
+
+    def _step_history(self, undo: bool):
+        """Move one step back (undo) or forward (redo) through the edit history.
+
+        A state whose pixels were trimmed is rebuilt on the preview pool first;
+        the stacks only change once _on_replay_ready has its pixels.
+        """
+        source, target = (self._undo_stack, self._redo_stack) if undo else (self._redo_stack, self._undo_stack)
+        if not source or self._replay_worker is not None:
+            return
+        base, applied, pixels = source[-1]
+        if pixels is None and applied:
+            start, done = self._replay_anchor(base, applied)
+            worker = MainWindow.ReplayWorker(source[-1], start, applied[done:], undo,
+                                             (self._base_image_bytes, self._applied_edits))
+            worker.signals.finished.connect(self._on_replay_ready)
+            worker.signals.error.connect(self._on_replay_error)
+            self._replay_worker = worker
+            self.status_label.setText('Undoing...' if undo else 'Redoing...')
+            self._preview_pool.start(worker)
+            return
+        # push the current state to the other stack, then restore the popped one
+        target.append(self._history_state())
+        self._restore_history_state(source.pop())
+        self._trim_history_pixels()
+
+    @QtCore.Slot(object)
+    def _on_replay_ready(self, arr: np.ndarray):
+        worker, self._replay_worker = self._replay_worker, None
         try:
-            self._undo_stack.append(self.original_image_bytes)
-            self._redo_stack.clear()
-        except Exception:
-            pass
-        self.original_image_bytes = new_bytes
-        self.edited_image_bytes = new_bytes
-        pix = QtGui.QPixmap()
-        pix.loadFromData(new_bytes)
-        self.current_pixmap = pix
-        self._update_image_label()
+            if worker is None:
+                return
+            source, target = (self._undo_stack, self._redo_stack) if worker.undo else (self._redo_stack, self._undo_stack)
+            if (not source or source[-1] is not worker.state
+                    or worker.origin[0] is not self._base_image_bytes
+                    or worker.origin[1] is not self._applied_edits):
+                # The history moved on meanwhile (reset, new image, ...): drop the result
+                return
+            base, applied, _ = source.pop()
+            target.append(self._history_state())
+            self._restore_history_state((base, applied, arr))
+            self._trim_history_pixels()
+            self.status_label.setText('')
+        finally:
+            self._update_undo_redo_buttons()
+
+    @QtCore.Slot(object)
+    def _on_replay_error(self, exc: object):
+        self._replay_worker = None
         self._update_undo_redo_buttons()
+        self.status_label.setText('Undo/redo failed')
+        print('Replaying edits failed:', exc)
+
+    def _trim_history_pixels(self):
+        # Keep decoded pixels for the most recent states while they fit the
+        # budget; older states fall back to replaying their edits on the base.
+        # Arrays shared between states are counted once.
+        kept = set()
+        used = 0
+        for stack in (self._undo_stack, self._redo_stack):
+            for i in range(len(stack) - 1, -1, -1):
+                base, applied, pixels = stack[i]
+                if pixels is None or id(pixels) in kept:
+                    continue
+                if used + pixels.nbytes > self._undo_budget:
+                    stack[i] = (base, applied, None)
+                else:
+                    kept.add(id(pixels))
+                    used += pixels.nbytes
 
     def _update_undo_redo_buttons(self):
-        self.undo_btn.setEnabled(len(self._undo_stack) > 0)
-        self.redo_btn.setEnabled(len(self._redo_stack) > 0)
+        idle = self._replay_worker is None
+        self.undo_btn.setEnabled(idle and len(self._undo_stack) > 0)
+        self.redo_btn.setEnabled(idle and len(self._redo_stack) > 0)
 
     def _add_prompt_history(self, prompt: str, max_items: int = 50):
         """Add a prompt to the editable combo's history, avoiding duplicates."""
         if not prompt:
             return
         try:
-            # remove existing occurrence
-            for i in range(self.prompt_combo.count() - 1, -1, -1):
-                if self.prompt_combo.itemText(i) == prompt:
-                    self.prompt_combo.removeItem(i)
-            # insert at top
-            self.prompt_combo.insertItem(0, prompt)
+            if next(reversed(self._prompt_history), None) == prompt:
+                # regenerating the newest prompt: nothing to reorder or save
+                self.prompt_combo.setCurrentIndex(0)
+                return
+            # move to front (dedupes in O(1)), then trim the oldest
+            self._prompt_history.pop(prompt, None)
+            self._prompt_history[prompt] = None
+            while len(self._prompt_history) > max_items:
+                self._prompt_history.popitem(last=False)
+            self._sync_prompt_combo()
             self.prompt_combo.setCurrentIndex(0)
-            # trim
-            while self.prompt_combo.count() > max_items:
-                self.prompt_combo.removeItem(self.prompt_combo.count() - 1)
-            # persist to disk
-            self._save_prompt_history()
+            # persist to disk (debounced)
+            self._history_save_timer.start()
         except Exception:
             pass
 
-    def _get_history_file_path(self) -> Path:
-        """Get the path to the prompt history JSON file."""
+    def _sync_prompt_combo(self):
+        # One model rebuild instead of a removeItem/insertItem per change
+        with _signals_blocked(self.prompt_combo):
+            self.prompt_combo.clear()
+            self.prompt_combo.addItems(list(reversed(self._prompt_history)))
+
+    def _get_data_dir(self) -> Path:
+        """App data directory for history and settings (not created here)."""
         app_data = QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.AppDataLocation)
         if not app_data:
             app_data = os.path.expanduser("~/.gemini_imagegen")
-        data_dir = Path(app_data)
-        data_dir.mkdir(parents=True, exist_ok=True)
-        return data_dir / "prompt_history.json"
+        return Path(app_data)
+
+    def _get_history_file_path(self) -> Path:
+        """Get the path to the prompt history file (one prompt per line, newest first)."""
+        return self._get_data_dir() / "prompt_history.txt"
     
     def _get_settings_file_path(self) -> Path:
         """Get the path to the app settings JSON file."""
-        app_data = QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.AppDataLocation)
-        if not app_data:
-            app_data = os.path.expanduser("~/.gemini_imagegen")
-        data_dir = Path(app_data)
-        data_dir.mkdir(parents=True, exist_ok=True)
-        return data_dir / "app_settings.json"
+        return self._get_data_dir() / "app_settings.json"
 
+    @QtCore.Slot()
     def _save_prompt_history(self):
         """Save current prompt history to disk."""
         try:
-            history = [self.prompt_combo.itemText(i) for i in range(self.prompt_combo.count())]
-            history_file = self._get_history_file_path()
-            with open(history_file, 'w', encoding='utf-8') as f:
-                json.dump(history, f, ensure_ascii=False, indent=2)
+            history = list(reversed(self._prompt_history))
+            history_file = self._history_file
+            # QSaveFile swaps the file in only after a complete write
+            out = QtCore.QSaveFile(str(history_file))
+            if not out.open(QtCore.QIODevice.WriteOnly):
+                raise OSError(out.errorString())
+            # prompts come from a single-line edit, so newlines can't appear inside one
+            out.write(('\n'.join(history) + '\n').encode('utf-8'))
+            if not out.commit():
+                raise OSError(out.errorString())
         except Exception as e:
             print(f'Failed to save prompt history: {e}')
 
     def _load_prompt_history(self):
         """Load prompt history from disk on startup."""
         try:
-            history_file = self._get_history_file_path()
+            history_file = self._history_file
+            legacy_file = history_file.with_name("prompt_history.json")
+            history = None
             if history_file.exists():
+                # only the newest 50 are used, so stop reading after them
                 with open(history_file, 'r', encoding='utf-8') as f:
+                    history = [line.rstrip('\n') for line in itertools.islice(f, 50)]
+            elif legacy_file.exists():
+                # older versions stored an indented JSON list
+                with open(legacy_file, 'r', encoding='utf-8') as f:
                     history = json.load(f)
-                if isinstance(history, list):
-                    for prompt in history[:50]:  # limit to 50
-                        if isinstance(prompt, str) and prompt.strip():
-                            self.prompt_combo.addItem(prompt)
+            if isinstance(history, list):
+                # file is newest first; keep the first occurrence of duplicates
+                for prompt in reversed(history[:50]):  # limit to 50
+                    if isinstance(prompt, str) and prompt.strip():
+                        self._prompt_history.pop(prompt, None)
+                        self._prompt_history[prompt] = None
+                self._sync_prompt_combo()
         except Exception as e:
             print(f'Failed to load prompt history: {e}')
     
+    @QtCore.Slot()
     def _save_app_settings(self):
         """Save app settings (window size, control states) to disk."""
         try:
@@ -882,96 +1334,107 @@ class MainWindow(QtWidgets.QMainWindow):
                 'aspect_ratio': self.aspect_ratio.currentText(),
                 'highres': self.highres_checkbox.isChecked(),
             }
-            settings_file = self._get_settings_file_path()
+            settings_file = self._settings_file
+            # serialize first, then one write instead of json.dump's many small ones
+            data = json.dumps(settings, ensure_ascii=False, indent=2)
             with open(settings_file, 'w', encoding='utf-8') as f:
-                json.dump(settings, f, ensure_ascii=False, indent=2)
+                f.write(data)
         except Exception as e:
             print(f'Failed to save app settings: {e}')
     
     def _load_app_settings(self):
         """Load app settings from disk on startup."""
         try:
-            settings_file = self._get_settings_file_path()
+            settings_file = self._settings_file
             if settings_file.exists():
                 with open(settings_file, 'r', encoding='utf-8') as f:
                     settings = json.load(f)
                 if isinstance(settings, dict):
                     # Block signals during load to prevent triggering saves
-                    self.lens_type.blockSignals(True)
-                    self.focal_length.blockSignals(True)
-                    self.aspect_ratio.blockSignals(True)
-                    self.highres_checkbox.blockSignals(True)
-                    
-                    # Restore window position and size
-                    if 'window_width' in settings and 'window_height' in settings:
-                        self.resize(settings['window_width'], settings['window_height'])
-                    if 'window_x' in settings and 'window_y' in settings:
-                        self.move(settings['window_x'], settings['window_y'])
-                    
-                    # Restore control states
-                    if 'lens_type' in settings:
-                        idx = self.lens_type.findText(settings['lens_type'])
-                        if idx >= 0:
-                            self.lens_type.setCurrentIndex(idx)
-                    
-                    if 'focal_length' in settings:
-                        idx = self.focal_length.findText(settings['focal_length'])
-                        if idx >= 0:
-                            self.focal_length.setCurrentIndex(idx)
-                    
-                    if 'aspect_ratio' in settings:
-                        idx = self.aspect_ratio.findText(settings['aspect_ratio'])
-                        if idx >= 0:
-                            self.aspect_ratio.setCurrentIndex(idx)
-                    
-                    if 'highres' in settings:
-                        self.highres_checkbox.setChecked(settings['highres'])
-                    
-                    # Unblock signals
-                    self.lens_type.blockSignals(False)
-                    self.focal_length.blockSignals(False)
-                    self.aspect_ratio.blockSignals(False)
-                    self.highres_checkbox.blockSignals(False)
+                    with _signals_blocked(self.lens_type, self.focal_length,
+                                          self.aspect_ratio, self.highres_checkbox):
+                        # Restore window position and size
+                        if 'window_width' in settings and 'window_height' in settings:
+                            self.resize(settings['window_width'], settings['window_height'])
+                        if 'window_x' in settings and 'window_y' in settings:
+                            self.move(settings['window_x'], settings['window_y'])
+
+                        # Restore control states
+                        if 'lens_type' in settings:
+                            idx = self.lens_type.findText(settings['lens_type'])
+                            if idx >= 0:
+                                self.lens_type.setCurrentIndex(idx)
+
+                        if 'focal_length' in settings:
+                            idx = self.focal_length.findText(settings['focal_length'])
+                            if idx >= 0:
+                                self.focal_length.setCurrentIndex(idx)
+
+                        if 'aspect_ratio' in settings:
+                            idx = self.aspect_ratio.findText(settings['aspect_ratio'])
+                            if idx >= 0:
+                                self.aspect_ratio.setCurrentIndex(idx)
+
+                        if 'highres' in settings:
+                            self.highres_checkbox.setChecked(settings['highres'])
         except Exception as e:
             print(f'Failed to load app settings: {e}')
 
     def closeEvent(self, event):
         """Save app settings when window is closed."""
+        self._settings_save_timer.stop()
         self._save_app_settings()
-        # Stop preview thread if running
+        # Flush a prompt history save that is still waiting on its timer
+        if self._history_save_timer.isActive():
+            self._history_save_timer.stop()
+            self._save_prompt_history()
+        # Let a running preview finish
         try:
-            if getattr(self, '_preview_thread', None) is not None:
-                self._preview_thread.quit()
-                self._preview_thread.wait(100)
+            self._preview_pool.waitForDone(100)
         except Exception:
             pass
         # Stop export thread if running
         try:
             if getattr(self, '_export_thread', None) is not None:
                 self._export_thread.quit()
-                self._export_thread.wait(100)
+                self._export_thread.wait()
         except Exception:
             pass
         event.accept()
 
     # --- Sharing helpers ---
-    def _get_current_image_bytes(self):
-        if getattr(self, 'edited_image_bytes', None):
-            return self.edited_image_bytes
-        if getattr(self, 'original_image_bytes', None):
-            return self.original_image_bytes
-        return None
+    def _write_current_image(self, path):
+        """Write the current image (the preview if one is showing, otherwise the
+        original) to path as PNG.
+
+        PNG bytes we already hold are written as they are; pixels (and loaded
+        files in other formats) are encoded straight into the file rather than
+        into an in-memory PNG first.
+        """
+        if self.edited_image_bytes:
+            # the loaded, generated or cropped original, in whatever format it came
+            data = self.edited_image_bytes
+        elif self._preview_image is not None:
+            if not self._preview_image.save(str(path), 'PNG'):
+                raise RuntimeError(f"Could not write {path}")
+            return
+        else:
+            data = self._original_image_bytes
+        if data is not None and data.startswith(b'\x89PNG'):
+            with open(path, 'wb') as f:
+                f.write(data)
+        else:
+            import edits
+            edits.write_png(self._original_array(), path)
 
     def _write_temp_share_file(self) -> Path:
-        data = self._get_current_image_bytes()
-        if not data:
+        if not self._has_image():
             raise RuntimeError("No image to share")
         share_dir = Path(tempfile.gettempdir()) / "gemini_imagegen_share"
         share_dir.mkdir(parents=True, exist_ok=True)
         ts = int(time.time())
         path = share_dir / f"shared_{ts}.png"
-        with open(path, 'wb') as f:
-            f.write(data)
+        self._write_current_image(path)
         return path
 
     def _share_via_email(self):
@@ -999,13 +1462,18 @@ class MainWindow(QtWidgets.QMainWindow):
             self.status_label.setText("Share via Viber failed")
             print("Share Viber failed", e)
 
+    @QtCore.Slot()
     def _copy_image_to_clipboard(self):
         try:
-            data = self._get_current_image_bytes()
-            if not data:
+            # Hand over the pixels we already have rather than a PNG round-trip
+            if self._preview_image is not None:
+                img = self._preview_image
+            elif self._has_image():
+                # copy(): the clipboard may outlive the array the QImage wraps
+                img = _array_to_qimage(self._original_array()).copy()
+            else:
                 raise RuntimeError("No image to copy")
-            img = QtGui.QImage()
-            if not img.loadFromData(data):
+            if img.isNull():
                 raise RuntimeError("Could not load image for clipboard")
             QtGui.QGuiApplication.clipboard().setImage(img)
             self.status_label.setText("Image copied to clipboard")
@@ -1013,91 +1481,24 @@ class MainWindow(QtWidgets.QMainWindow):
             self.status_label.setText("Copy to clipboard failed")
             print("Copy clipboard failed", e)
     
+    @QtCore.Slot()
     def _undo(self):
-        if not self._undo_stack:
-            return
         try:
-            # push current original to redo, pop last undo
-            self._redo_stack.append(self.original_image_bytes)
-            prev = self._undo_stack.pop()
-            self.original_image_bytes = prev
-            self.edited_image_bytes = prev
-            pix = QtGui.QPixmap()
-            pix.loadFromData(prev)
-            self.current_pixmap = pix
-            self._update_image_label()
+            self._step_history(undo=True)
         finally:
             self._update_undo_redo_buttons()
 
+    @QtCore.Slot()
     def _redo(self):
-        if not self._redo_stack:
-            return
         try:
-            self._undo_stack.append(self.original_image_bytes)
-            nxt = self._redo_stack.pop()
-            self.original_image_bytes = nxt
-            self.edited_image_bytes = nxt
-            pix = QtGui.QPixmap()
-            pix.loadFromData(nxt)
-            self.current_pixmap = pix
-            self._update_image_label()
+            self._step_history(undo=False)
         finally:
             self._update_undo_redo_buttons()
 
-    def _apply_edits_bytes(self, image_bytes: bytes, settings: dict) -> bytes:
-        # Use Pillow to apply edits and return PNG bytes
-        bio = io.BytesIO(image_bytes)
-        img = Image.open(bio).convert('RGB')
-
-        # Filters
-        filt = settings.get('filter', 'None')
-        if filt == 'Grayscale':
-            img = ImageOps.grayscale(img).convert('RGB')
-        elif filt == 'Sepia':
-            sep = ImageOps.colorize(ImageOps.grayscale(img), '#704214', '#C0A080')
-            img = sep
-        elif filt == 'Blur':
-            img = img.filter(ImageFilter.GaussianBlur(radius=2))
-        elif filt == 'Sharpen':
-            img = img.filter(ImageFilter.UnsharpMask(radius=2, percent=150, threshold=3))
-
-        # Brightness, Contrast, Saturation
-        bri = settings.get('brightness', 1.0)
-        con = settings.get('contrast', 1.0)
-        sat = settings.get('saturation', 1.0)
-        if bri != 1.0:
-            img = ImageEnhance.Brightness(img).enhance(bri)
-        if con != 1.0:
-            img = ImageEnhance.Contrast(img).enhance(con)
-        if sat != 1.0:
-            img = ImageEnhance.Color(img).enhance(sat)
-
-        # Vignette (darken corners)
-        vig = settings.get('vignette', 0.0)
-        if vig and vig > 0.0:
-            width, height = img.size
-            # create radial mask
-            vignette = Image.new('L', (width, height), 255)
-            for y in range(height):
-                for x in range(width):
-                    # distance to center
-                    dx = (x - width / 2) / (width / 2)
-                    dy = (y - height / 2) / (height / 2)
-                    d = (dx * dx + dy * dy) ** 0.5
-                    # mask value decreases with distance
-                    val = 255 - int(255 * min(1.0, (d - 0.0) * vig * 1.5))
-                    vignette.putpixel((x, y), max(0, min(255, val)))
-            img.putalpha(vignette)
-            background = Image.new('RGB', img.size, (0, 0, 0))
-            background.paste(img, mask=img.split()[3])
-            img = background
-
-        out = io.BytesIO()
-        img.save(out, format='PNG')
-        return out.getvalue()
-
+    @QtCore.Slot()
     def on_save(self):
-        if not self.current_pixmap:
+        # Nothing to save until an image is generated or loaded (not the splash)
+        if not self._has_image():
             return
         default_dir = QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.PicturesLocation) or os.path.expanduser("~/Pictures")
         path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Save as PNG", default_dir, "PNG Files (*.png)")
@@ -1106,18 +1507,13 @@ class MainWindow(QtWidgets.QMainWindow):
             if not path.lower().endswith('.png'):
                 path += '.png'
             try:
-                if getattr(self, 'edited_image_bytes', None):
-                    with open(path, 'wb') as f:
-                        f.write(self.edited_image_bytes)
-                else:
-                    # fallback to pixmap save
-                    saved = self.current_pixmap.save(path, "PNG")
-                    if not saved:
-                        raise RuntimeError('QPixmap failed to save')
+                # Bytes we already hold before any re-encode of what is on screen
+                self._write_current_image(path)
                 self.status_label.setText(f"Saved to {path}")
             except Exception as e:
                 QtWidgets.QMessageBox.warning(self, "Save failed", str(e))
 
+    @QtCore.Slot()
     def on_load_image(self):
         default_dir = QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.PicturesLocation) or os.path.expanduser("~/Pictures")
         path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Load Image", default_dir, "Image Files (*.png *.jpg *.jpeg *.bmp *.gif);;All Files (*)")
@@ -1127,21 +1523,18 @@ class MainWindow(QtWidgets.QMainWindow):
             with open(path, 'rb') as f:
                 image_bytes = f.read()
             
-            # Validate it's a valid image
-            pix = QtGui.QPixmap()
-            if not pix.loadFromData(image_bytes):
+            # Validate it's a valid image (decoded once for display and edits)
+            pix = self._load_original(image_bytes)
+            if pix.isNull():
                 raise RuntimeError("Failed to load image")
             
             # Store and display
             self.current_pixmap = pix
-            self.original_image_bytes = image_bytes
             self.edited_image_bytes = image_bytes
             self._last_model_used = "loaded"
             
             # Clear undo/redo
-            self._undo_stack.clear()
-            self._redo_stack.clear()
-            self._update_undo_redo_buttons()
+            self._set_base_image(image_bytes)
             
             # Enable edit controls
             self._set_edit_controls_enabled(True)
@@ -1158,43 +1551,40 @@ class MainWindow(QtWidgets.QMainWindow):
             self.status_label.setText(f"Failed to load image: {str(e)}")
             QtWidgets.QMessageBox.warning(self, "Load failed", str(e))
 
+    @QtCore.Slot()
     def on_crop(self):
-        if not self.current_pixmap or not getattr(self, 'original_image_bytes', None):
+        if not self.current_pixmap or not self._has_image():
             return
         
         try:
-            dialog = CropDialog(self.original_image_bytes, self)
+            # The dialog works on the decoded pixels: no PNG encode of an
+            # applied edit here, and no decode of the crop result afterwards
+            dialog = CropDialog(self._original_array(), self)
             if dialog.exec():
                 cropped_bytes = dialog.get_cropped_bytes()
                 if cropped_bytes:
-                    self.original_image_bytes = cropped_bytes
+                    pix = self._load_original(cropped_bytes, dialog.cropped_array)
                     self.edited_image_bytes = cropped_bytes
-                    
-                    pix = QtGui.QPixmap()
-                    pix.loadFromData(cropped_bytes)
                     self.current_pixmap = pix
                     self._update_image_label()
                     
-                    self._undo_stack.clear()
-                    self._redo_stack.clear()
-                    self._update_undo_redo_buttons()
+                    self._set_base_image(cropped_bytes)
                     
-                    img = Image.open(io.BytesIO(cropped_bytes))
-                    self.status_label.setText(f"Cropped to {img.width}×{img.height}")
+                    self.status_label.setText(f"Cropped to {pix.width()}×{pix.height()}")
         except Exception as e:
             self.status_label.setText(f"Crop failed: {str(e)}")
             print("Crop error:", e)
 
 
 class CropDialog(QtWidgets.QDialog):
-    def __init__(self, image_bytes: bytes, parent=None):
+    def __init__(self, image: np.ndarray, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Crop Image")
         self.setGeometry(100, 100, 800, 600)
-        self.image_bytes = image_bytes
         self.cropped_bytes = None
+        self.cropped_array = None
         
-        self.img = Image.open(io.BytesIO(image_bytes)).convert('RGB')
+        self.img = Image.fromarray(image)
         
         layout = QtWidgets.QVBoxLayout()
         layout.setContentsMargins(0, 0, 0, 0)
@@ -1225,6 +1615,7 @@ class CropDialog(QtWidgets.QDialog):
         self.canvas.crop_applied.connect(self._on_crop_applied)
         self.canvas.crop_cancelled.connect(self.reject)
     
+    @QtCore.Slot(tuple)
     def _on_crop_applied(self, box):
         """Handle crop box application."""
         if not box:
@@ -1244,9 +1635,10 @@ class CropDialog(QtWidgets.QDialog):
         
         cropped = self.img.crop((left, top, right, bottom))
         buf = io.BytesIO()
-        cropped.save(buf, format='PNG')
+        cropped.save(buf, format='PNG', compress_level=1, optimize=False)
         buf.seek(0)
         self.cropped_bytes = buf.getvalue()
+        self.cropped_array = np.asarray(cropped)
         self.accept()
     
     def get_cropped_bytes(self):
@@ -1263,12 +1655,8 @@ class CropCanvas(QtWidgets.QWidget):
         self.setMinimumSize(400, 300)
         self.setFocusPolicy(Qt.StrongFocus)
         
-        # Convert PIL to QPixmap
-        buf = io.BytesIO()
-        pil_img.save(buf, format='PNG')
-        buf.seek(0)
-        self.qpixmap = QtGui.QPixmap()
-        self.qpixmap.loadFromData(buf.getvalue())
+        # Convert PIL to QPixmap from the raw RGB pixels (no PNG round trip)
+        self.qpixmap = QtGui.QPixmap.fromImage(_array_to_qimage(np.asarray(pil_img)))
         
         # Crop box: (x1, y1, x2, y2) in normalized [0, 1]
         self.crop_box = None
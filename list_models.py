@@ -1,11 +1,22 @@
 import os, sys
-sys.path.insert(0, r'd:\Python\Projects\Test\Gemini\ImageGen')
-from google import genai
-client = genai.Client(api_key=os.environ.get('GEMINI_API_KEY'))
-print('Listing models via client.models.list()')
-try:
-    for m in client.models.list():
-        name = getattr(m, 'name', None) or getattr(m, 'model', None) or str(m)
-        print('-', name)
-except Exception as e:
-    print('client.models.list() failed:', repr(e))
+
+
+def main():
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    api_key = os.environ.get('GEMINI_API_KEY')
+    if not api_key:
+        print('GEMINI_API_KEY is not set')
+        return
+    from google import genai
+    client = genai.Client(api_key=api_key)
+    print('Listing models via client.models.list()')
+    try:
+        for m in client.models.list():
+            name = getattr(m, 'name', None) or getattr(m, 'model', None) or str(m)
+            print('-', name)
+    except Exception as e:
+        print('client.models.list() failed:', repr(e))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,9 @@
 import io
+import edits
 from edits import apply_edits_bytes
 from PIL import Image
+import numpy as np
+import pytest
 
 
 def test_apply_edits_basic():
@@ -18,6 +21,143 @@ def test_apply_edits_basic():
     assert img2.size == (128, 128)
 
 
+def test_numba_kernel_matches_numpy():
+    pytest.importorskip('numba')
+    if not edits._HAS_NUMBA:
+        pytest.skip('numba unavailable')
+    rng = np.random.default_rng(0)
+    src = rng.integers(0, 256, (64, 48, 3), dtype=np.uint8)
+    for filt in ('None', 'Grayscale', 'Sepia'):
+        args = (filt, 1.1, 1.2, 1.3, 0.4)
+        a = edits._color_numba(src, *args).astype(int)
+        b = edits._color_numpy(src, *args).astype(int)
+        assert np.abs(a - b).max() <= 2
+
+
+def test_color_paths_match_image_enhance():
+    from PIL import ImageEnhance, ImageOps
+    rng = np.random.default_rng(7)
+    # mirrored pixel pairs pin the mean luma after brightness near 128, where
+    # both contrast models pivot, and the narrow spread keeps ImageEnhance's
+    # intermediate clipping out of play
+    for mid, bri, con, sat in ((128, 1.0, 1.3, 1.4), (160, 0.8, 1.3, 1.4), (100, 1.28, 0.7, 0.6),
+                               (160, 0.8, 1.2, 0.5)):
+        half = rng.integers(-40, 41, (20, 30, 3))
+        src = np.concatenate([mid + half, mid - half]).astype(np.uint8)
+        img = ImageEnhance.Brightness(Image.fromarray(src)).enhance(bri)
+        ref = ImageEnhance.Color(ImageEnhance.Contrast(img).enhance(con)).enhance(sat)
+        out = edits._color_numpy(src, 'None', bri, con, sat, 0.0).astype(int)
+        assert np.abs(out - np.asarray(ref)).max() <= 3
+        gray = ImageEnhance.Brightness(ImageOps.grayscale(Image.fromarray(src)).convert('RGB')).enhance(bri)
+        ref = ImageEnhance.Contrast(gray).enhance(con)
+        out = edits._color_gray(src, bri, con, 0.0).astype(int)
+        assert np.abs(out - np.asarray(ref)).max() <= 3
+
+
+def test_striped_matches_whole_image(monkeypatch):
+    rng = np.random.default_rng(1)
+    src = rng.integers(0, 256, (edits._STRIPE_ROWS * 2 + 37, 40, 3), dtype=np.uint8)
+    # cached masks sliced per stripe, then masks built per stripe as for full-resolution images
+    for max_pixels in (edits._MASK_CACHE_MAX_PIXELS, 0):
+        monkeypatch.setattr(edits, '_MASK_CACHE_MAX_PIXELS', max_pixels)
+        for filt, shp in (('None', 1.0), ('Film', 1.0), ('Sharpen', 0.4), ('Blur', 1.5), ('Grayscale', 1.0)):
+            args = (filt, 1.1, 1.2, 1.3, 0.4, shp)
+            whole = edits._edit_array(src, *args, scale=0.5)
+            assert np.array_equal(edits._edit_striped(src, *args, scale=0.5), whole)
+
+
+def test_pillow_vignette_matches_exact_falloff():
+    rng = np.random.default_rng(4)
+    img = Image.fromarray(rng.integers(0, 256, (50, 40, 3), dtype=np.uint8))
+    y, x = np.mgrid[0:50, 0:40]
+    d = np.hypot((x - 20) / 20, (y - 25) / 25)
+    for vig in (0.3, 0.8):
+        # the per-pixel mask the putpixel loop used to build
+        exact = 255 - (255 * np.minimum(1.0, d * vig * 1.5)).astype(int)
+        ref = Image.composite(img, Image.new('RGB', img.size), Image.fromarray(exact.astype(np.uint8)))
+        diff = np.abs(np.asarray(edits._pillow_vignette(img, vig)).astype(int) - np.asarray(ref))
+        assert diff.max() <= 12 and diff.mean() <= 2
+
+
+def test_decode_cache_keys_on_content(monkeypatch):
+    from collections import OrderedDict
+    monkeypatch.setattr(edits, '_decode_cache', OrderedDict())
+    rng = np.random.default_rng(6)
+    src = rng.integers(0, 256, (24, 32, 3), dtype=np.uint8)
+
+    def encode(arr, level):
+        buf = io.BytesIO()
+        Image.fromarray(arr).save(buf, format='PNG', compress_level=level)
+        return buf.getvalue()
+
+    data = encode(src, 1)
+    first = np.array(edits._decode_rgb(data))
+    # a hit hands back the cached pixels, unchanged
+    assert edits._decode_rgb(bytes(data)) is edits._decode_rgb(data)
+    assert np.array_equal(edits._decode_rgb(data), first)
+    assert np.array_equal(first, src)
+    # the same pixels encoded differently, and bytes differing in one pixel,
+    # each get their own entry
+    other = src.copy()
+    other[0, 0, 0] ^= 1
+    for blob in (encode(src, 9), encode(other, 1)):
+        assert blob != data
+        assert edits._decode_rgb(blob) is not edits._decode_rgb(data)
+    assert len(edits._decode_cache) == 3
+    assert np.array_equal(edits._decode_rgb(encode(other, 1)), other)
+    assert np.array_equal(edits._decode_rgb(data), src)
+
+
+def test_parallel_filter_matches_pillow(monkeypatch):
+    from PIL import ImageFilter
+    # force several tiles even on a single-core machine
+    monkeypatch.setattr(edits.os, 'cpu_count', lambda: 4)
+    rng = np.random.default_rng(3)
+    img = Image.fromarray(rng.integers(0, 256, (edits._FILTER_TILE_ROWS * 3 + 17, 30, 3), dtype=np.uint8))
+    for flt in (ImageFilter.GaussianBlur(2.5), ImageFilter.UnsharpMask(radius=2, percent=150, threshold=3)):
+        assert np.array_equal(np.asarray(edits._parallel_filter(img, flt)), np.asarray(img.filter(flt)))
+
+
+def test_pillow_film_matches_enhance_chain():
+    from PIL import ImageEnhance
+    rng = np.random.default_rng(5)
+    img = Image.fromarray(rng.integers(0, 256, (50, 40, 3), dtype=np.uint8))
+    ref = ImageEnhance.Color(ImageEnhance.Contrast(img).enhance(1.08)).enhance(1.05)
+    r, g, b = ref.split()
+    ref = Image.merge('RGB', (ImageEnhance.Brightness(r).enhance(1.02), g, b))
+    diff = np.asarray(edits._pillow_film(img)).astype(int) - np.asarray(ref)
+    assert np.abs(diff).max() <= 3
+
+
+def test_pillow_vignette_matches_composite():
+    rng = np.random.default_rng(4)
+    img = Image.fromarray(rng.integers(0, 256, (50, 40, 3), dtype=np.uint8))
+    for vig in (0.3, 0.8):
+        mask = edits._pillow_vignette_mask(40, 50, vig)
+        ref = Image.composite(img, Image.new('RGB', img.size), mask)
+        assert np.array_equal(np.asarray(edits._pillow_vignette(img, vig)), np.asarray(ref))
+
+
+def test_cv2_filters_match_pillow(monkeypatch):
+    if not edits._HAS_CV2:
+        pytest.skip('opencv unavailable')
+    from PIL import ImageFilter
+    rng = np.random.default_rng(2)
+    src = rng.integers(0, 256, (90, 70, 3), dtype=np.uint8)
+    for radius in (0.5, 1.0, 2.0, 5.0):
+        ref = np.asarray(Image.fromarray(src).filter(ImageFilter.GaussianBlur(radius))).astype(int)
+        assert np.abs(edits._cv2_gaussian_blur(src, radius).astype(int) - ref).max() <= 2
+    # whole pipeline: only the blur steps may differ, and only by the blur's rounding
+    for filt, shp in (('Sharpen', 1.6), ('Blur', 1.0), ('None', 0.4)):
+        args = (filt, 1.1, 1.2, 1.3, 0.0, shp)
+        with_cv2 = edits._edit_array(src, *args).astype(int)
+        monkeypatch.setattr(edits, '_HAS_CV2', False)
+        pillow = edits._edit_array(src, *args).astype(int)
+        monkeypatch.setattr(edits, '_HAS_CV2', True)
+        # the colour stage can scale the blur's 2 levels up a little
+        assert np.abs(with_cv2 - pillow).max() <= (0 if filt == 'Sharpen' else 4)
+
+
 if __name__ == '__main__':
     test_apply_edits_basic()
     print('edit helper smoke test passed')